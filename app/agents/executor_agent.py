@@ -1,5 +1,6 @@
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 import json
@@ -7,6 +8,8 @@ import re
 from typing import Dict, Any, List
 
 from app.agents.tools.query_executor_tool import QueryExecutorTool
+from app.core.config import settings
+from app.utils.sql_validator import validate_sql, SQLValidationError
 
 
 PROMPT_PATH = Path(__file__).parent / "prompts" / "executor_agent.md"
@@ -50,6 +53,21 @@ class ExecutorAgent:
         explanation: str,
         tables_context: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
+        # Parsing locally is deterministic and takes milliseconds; the LLM is
+        # only asked when the SQL cannot be validated against the schema
+        try:
+            return validate_sql(sql, tables_context)
+        except SQLValidationError as e:
+            print(f"[ExecutorAgent] Local validation failed, asking LLM: {e}")
+
+        return await self._llm_validate_and_split_queries(sql, explanation, tables_context)
+
+    async def _llm_validate_and_split_queries(
+        self,
+        sql: str,
+        explanation: str,
+        tables_context: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
         
         prompt = self.validator_template.format(
             sql=sql,
@@ -115,6 +133,7 @@ class ExecutorAgent:
             result = await self.executor_tool.execute(current_sql, session)
             
             if result["success"]:
+                result["sql"] = current_sql
                 return result
             
             if attempt < self.max_retries:
@@ -133,13 +152,48 @@ class ExecutorAgent:
         
         return result
 
+    async def _run_query(
+        self,
+        idx: int,
+        query: str,
+        session: AsyncSession,
+        tables: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        print(f"[ExecutorAgent] Processing Query {idx}")
+
+        result = await self._execute_with_retry(
+            query,
+            session,
+            tables,
+            query_index=idx
+        )
+
+        if result["success"]:
+            print(f"[ExecutorAgent] ✅ Query {idx} executed successfully")
+            print(f"[ExecutorAgent] Returned {result['row_count']} rows")
+            if result.get("truncated"):
+                print(f"[ExecutorAgent] Result truncated to {self.max_rows} rows")
+        else:
+            print(f"[ExecutorAgent] ❌ Query {idx} failed: {result['error']}")
+
+        return {
+            "query_index": idx,
+            "query": query,
+            "result": result
+        }
+
     async def run(
         self,
         sql: str,
         explanation: str,
         session: AsyncSession,
         tables: List[Dict[str, Any]],
+        queries: List[str] | None = None,
     ) -> Dict[str, Any]:
+        """
+        Validate, split and execute ``sql``. Pass ``queries`` that are already known
+        to be valid (e.g. from the SQL cache) to skip the validator.
+        """
         
         print(f"\n{'='*80}")
         print(f"[ExecutorAgent] Starting execution")
@@ -147,16 +201,19 @@ class ExecutorAgent:
         print(f"[ExecutorAgent] Explanation: {explanation}")
         print(f"{'='*80}\n")
         
-        validation_result = await self._validate_and_split_queries(
-            sql, explanation, tables
-        )
-        
-        queries = validation_result.get("queries", [])
-        was_fixed = validation_result.get("fixed", False)
-        changes = validation_result.get("changes_made", "none")
-        
-        if was_fixed:
-            print(f"[ExecutorAgent] Queries were validated/fixed: {changes}")
+        if queries is None:
+            validation_result = await self._validate_and_split_queries(
+                sql, explanation, tables
+            )
+
+            queries = validation_result.get("queries", [])
+            was_fixed = validation_result.get("fixed", False)
+            changes = validation_result.get("changes_made", "none")
+
+            if was_fixed:
+                print(f"[ExecutorAgent] Queries were validated/fixed: {changes}")
+        else:
+            print(f"[ExecutorAgent] Using {len(queries)} pre-validated query(ies)")
         
         if not queries:
             return {
@@ -169,33 +226,24 @@ class ExecutorAgent:
         
         print(f"[ExecutorAgent] Found {len(queries)} query(ies) to execute\n")
         
-        results = []
-        successful_count = 0
-        
-        for idx, query in enumerate(queries, 1):
-            print(f"\n{'-'*80}")
-            print(f"[ExecutorAgent] Processing Query {idx}/{len(queries)}")
-            print(f"{'-'*80}")
-            
-            result = await self._execute_with_retry(
-                query,
-                session,
-                tables,
-                query_index=idx
-            )
-            
-            if result["success"]:
-                successful_count += 1
-                print(f"[ExecutorAgent] ✅ Query {idx} executed successfully")
-                print(f"[ExecutorAgent] Returned {result['row_count']} rows")
-            else:
-                print(f"[ExecutorAgent] ❌ Query {idx} failed: {result['error']}")
-            
-            results.append({
-                "query_index": idx,
-                "query": query,
-                "result": result
-            })
+        if len(queries) == 1:
+            results = [await self._run_query(1, queries[0], session, tables)]
+        else:
+            # Split statements are independent SELECTs: run them side by side,
+            # each on its own pooled connection, so the slowest one sets the pace
+            semaphore = asyncio.Semaphore(settings.EXECUTOR_MAX_PARALLEL_QUERIES)
+
+            async def run_isolated(idx: int, query: str) -> Dict[str, Any]:
+                async with semaphore:
+                    async with AsyncSession(session.bind, expire_on_commit=False) as query_session:
+                        return await self._run_query(idx, query, query_session, tables)
+
+            results = await asyncio.gather(*(
+                run_isolated(idx, query)
+                for idx, query in enumerate(queries, 1)
+            ))
+
+        successful_count = sum(1 for item in results if item["result"]["success"])
         
         print(f"\n{'='*80}")
         print(f"[ExecutorAgent] Execution complete")
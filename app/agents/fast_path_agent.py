@@ -0,0 +1,250 @@
+# app/agents/fast_path_agent.py
+import os
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agents.tools.query_executor_tool import QueryExecutorTool
+from app.models.mapping_mng import DBMapping
+from app.utils.schema_index import tokenize
+
+ROW_COUNT = "row_count"
+COLUMNS = "columns"
+VALUES = "values"
+
+# Words that refer to "the data" without naming a table
+GENERIC_TABLE_WORDS = {
+    "data", "dataset", "table", "file", "sheet", "spreadsheet", "database", "db",
+    "upload", "csv", "excel", "xlsx",
+}
+
+# Most common values listed when a column has more than that
+MAX_VALUES = 50
+
+# "What values exist in <column>" is only a lookup for categorical columns
+CONTINUOUS_TYPES = {"float", "date", "datetime"}
+
+_TABLE = r"(?: (?:in|of|for|from) (?P<table>.+?))?"
+_COLUMN = r"(?:the )?(?P<column>.+?)(?: column| field)?"
+
+INTENT_PATTERNS = [
+    (ROW_COUNT, re.compile(
+        r"^(?:how many|what is the number of|number of|count(?: of)?(?: the)?|total number of) "
+        r"(?:rows|records|entries|lines)(?: are there| are| exist)?" + _TABLE + r"$"
+    )),
+    (ROW_COUNT, re.compile(
+        r"^how many (?:rows|records|entries|lines) (?:does|do) (?P<table>.+?) (?:have|contain)$"
+    )),
+    (ROW_COUNT, re.compile(
+        r"^(?:what is )?(?:the )?(?:row|record) count" + _TABLE + r"$"
+    )),
+    (COLUMNS, re.compile(
+        r"^(?:list|show|show me|give me|display|what are)(?: all)?(?: the)? "
+        r"(?:columns|fields|column names)(?: available)?" + _TABLE + r"$"
+    )),
+    (COLUMNS, re.compile(
+        r"^what (?:columns|fields) (?:are there|are available|exist|do i have)" + _TABLE + r"$"
+    )),
+    (COLUMNS, re.compile(
+        r"^what (?:columns|fields) (?:does|do) (?P<table>.+?) (?:have|contain)$"
+    )),
+    (COLUMNS, re.compile(
+        r"^(?:describe|what is the schema of|show the schema of|schema of) (?P<table>.+)$"
+    )),
+    (VALUES, re.compile(
+        r"^what (?:categories|values|types|options|kinds|levels|statuses)"
+        r"(?: exist| are there| are available| are possible)? (?:in|for|of) "
+        + _COLUMN + _TABLE + r"$"
+    )),
+    (VALUES, re.compile(
+        r"^(?:list|show|show me|give me|what are)(?: all)?(?: the)? "
+        r"(?:(?:distinct|unique|different|possible) )?(?:values|categories|options) (?:of|in|for) "
+        + _COLUMN + _TABLE + r"$"
+    )),
+    (VALUES, re.compile(
+        r"^what are the (?:distinct |unique |different |possible )?(?P<column>.+?) "
+        r"(?:values|categories|options)" + _TABLE + r"$"
+    )),
+]
+
+
+def _normalize(question: str) -> str:
+    question = re.sub(r"[?!.]+$", "", question.strip().lower())
+    return re.sub(r"\s+", " ", question)
+
+
+def _file_stem(table: Dict[str, Any]) -> str:
+    return os.path.splitext(table.get("file_name") or "")[0]
+
+
+class FastPathAgent:
+    """
+    Answers trivial questions about the user's tables (row counts, column lists,
+    category values) from stored metadata or one templated query, without any
+    LLM call. ``match`` returns None for anything it is not certain about.
+    """
+
+    def __init__(self):
+        self.executor_tool = QueryExecutorTool(max_rows=MAX_VALUES)
+
+    def _resolve_table(
+        self,
+        phrase: str | None,
+        tables: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Tables the phrase can refer to; every table when it names none."""
+        terms = [
+            term for term in tokenize(phrase or "")
+            if term not in GENERIC_TABLE_WORDS
+        ]
+        if not terms:
+            return tables
+
+        matches = []
+        for table in tables:
+            if phrase.strip().lower() == table["table_name"].lower():
+                return [table]
+            names = set(tokenize(_file_stem(table)))
+            if set(terms) <= names:
+                matches.append(table)
+        return matches
+
+    def _resolve_column(
+        self,
+        phrase: str,
+        tables: List[Dict[str, Any]]
+    ) -> List[tuple[Dict[str, Any], Dict[str, Any]]]:
+        terms = tokenize(phrase)
+        if not terms:
+            return []
+        return [
+            (table, column)
+            for table in tables
+            for column in table.get("schema") or []
+            if tokenize(column["column_name"]) == terms
+            and column.get("inferred_type") not in CONTINUOUS_TYPES
+        ]
+
+    def match(self, question: str, tables: List[Dict[str, Any]]) -> Dict[str, Any] | None:
+        """
+        Returns {"intent", "table", "column"} when ``question`` is a trivial
+        question about exactly one table (and column), otherwise None.
+        """
+        normalized = _normalize(question)
+
+        for intent, pattern in INTENT_PATTERNS:
+            found = pattern.match(normalized)
+            if not found:
+                continue
+
+            candidates = self._resolve_table(found.groupdict().get("table"), tables)
+
+            if intent == VALUES:
+                columns = self._resolve_column(found.group("column"), candidates)
+                if len(columns) != 1:
+                    return None
+                table, column = columns[0]
+                return {"intent": intent, "table": table, "column": column}
+
+            if len(candidates) != 1:
+                return None
+            return {"intent": intent, "table": candidates[0], "column": None}
+
+        return None
+
+    async def _load_profile(self, user_id: str, table_name: str) -> dict | None:
+        mapping = await DBMapping.find_one(
+            DBMapping.user_id == str(user_id),
+            DBMapping.table_name == table_name,
+        )
+        return mapping.column_profile if mapping else None
+
+    async def _count_rows(self, table_name: str, session: AsyncSession) -> int | None:
+        result = await self.executor_tool.execute(
+            f'SELECT COUNT(*) AS row_count FROM "{table_name}"', session
+        )
+        if not result["success"]:
+            return None
+        return result["data"].rows()[0][0]
+
+    async def _value_counts(
+        self,
+        table_name: str,
+        column_name: str,
+        session: AsyncSession
+    ) -> tuple[List[List[Any]], bool] | None:
+        """(value, row count) pairs, most common first, and whether more values exist."""
+        column = column_name.replace('"', '""')
+        result = await self.executor_tool.execute(
+            f'SELECT "{column}" AS value, COUNT(*) AS row_count FROM "{table_name}" '
+            f'WHERE "{column}" IS NOT NULL GROUP BY 1 ORDER BY 2 DESC, 1',
+            session,
+        )
+        if not result["success"]:
+            return None
+        return result["data"].rows(), result["truncated"]
+
+    async def run(
+        self,
+        match: Dict[str, Any],
+        user_id: str,
+        session: AsyncSession,
+    ) -> str | None:
+        """Markdown answer for a ``match``; None when the data could not be read."""
+        table = match["table"]
+        table_name = table["table_name"]
+        label = table.get("file_name") or table_name
+
+        if match["intent"] == COLUMNS:
+            schema = table.get("schema") or []
+            lines = [
+                f"**{label}** has **{len(schema)}** columns:",
+                "",
+                "| Column | Type | Description |",
+                "|---|---|---|",
+            ]
+            for column in schema:
+                description = (column.get("description") or "").replace("|", "/").replace("\n", " ")
+                lines.append(
+                    f"| {column['column_name']} | {column.get('inferred_type', '')} | {description} |"
+                )
+            return "\n".join(lines)
+
+        profile = await self._load_profile(user_id, table_name)
+
+        if match["intent"] == ROW_COUNT:
+            row_count = profile.get("row_count") if profile else None
+            if row_count is None:
+                row_count = await self._count_rows(table_name, session)
+            if row_count is None:
+                return None
+            return f"**{label}** has **{row_count:,}** rows."
+
+        column_name = match["column"]["column_name"]
+        stats = (profile or {}).get("columns", {}).get(column_name) or {}
+
+        if stats.get("values") is not None:
+            values = stats["values"]
+            lines = [f"**{column_name}** in **{label}** has **{len(values)}** distinct values:", ""]
+            lines.extend(f"- {value}" for value in values)
+            return "\n".join(lines)
+
+        value_counts = await self._value_counts(table_name, column_name, session)
+        if value_counts is None:
+            return None
+
+        counts, more = value_counts
+        if more:
+            distinct = stats.get("distinct_count")
+            heading = (
+                f"**{column_name}** in **{label}** has "
+                f"{f'about **{distinct:,}**' if distinct else f'more than {MAX_VALUES}'} "
+                f"distinct values. The {len(counts)} most common:"
+            )
+        else:
+            heading = f"**{column_name}** in **{label}** has **{len(counts)}** distinct values:"
+
+        lines = [heading, "", "| Value | Rows |", "|---|---|"]
+        lines.extend(f"| {value} | {count:,} |" for value, count in counts)
+        return "\n".join(lines)
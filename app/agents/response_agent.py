@@ -4,6 +4,8 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 import json
 
+from app.core.config import settings
+
 PROMPT_PATH = Path(__file__).parent / "prompts" / "response_agent.md"
 
 
@@ -19,7 +21,7 @@ class ResponseAgent:
 
         self.prompt = PromptTemplate(
             template=PROMPT_PATH.read_text(),
-            input_variables=["user_question", "sql_query", "columns", "rows", "row_count"]
+            input_variables=["user_question", "sql_query", "columns", "rows", "row_count", "truncation_note"]
         )
 
         self.chain = self.prompt | self.llm | StrOutputParser()
@@ -29,7 +31,13 @@ class ResponseAgent:
         sql_query: str,
         user_question: str,
         execution_result: dict,
+        result_summary: str | None = None,
     ) -> AsyncGenerator[str, None]:
+        """
+        Stream the answer for the first query's result. ``result_summary`` is the
+        precomputed text for that result (see ``summarize_result``); without it the
+        result is rendered here.
+        """
 
         if not execution_result.get("success"):
             yield "I encountered an error while querying the database."
@@ -49,7 +57,13 @@ class ResponseAgent:
             "user_question": user_question,
             "sql_query": results[0]["query"],
             "columns": json.dumps(single_result.get("columns", [])),
-            "rows": json.dumps(single_result.get("rows", []), indent=2),
-            "row_count": single_result.get("row_count", 0)
+            "rows": result_summary or single_result["data"].render(settings.RESPONSE_RESULT_MAX_TOKENS),
+            "row_count": single_result.get("row_count", 0),
+            "truncation_note": (
+                f"Only the first {single_result.get('row_count', 0)} rows were returned; "
+                "the full result is larger."
+                if single_result.get("truncated")
+                else "This is the complete result."
+            )
         }):
             yield chunk
\ No newline at end of file
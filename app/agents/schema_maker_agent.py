@@ -3,18 +3,26 @@ from pathlib import Path
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
+import asyncio
 import json
 import re
 
 from app.core.config import settings
+from app.utils.token_estimator import estimate_tokens
 
 PROMPT_PATH = Path(__file__).parent / "prompts" / "schema_maker_agent.md"
 
 
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
 class SchemaMakerAgent:
     def __init__(self):
+        self.model = settings.SCHEMA_MODEL
+
         self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
+            model=self.model,
             temperature=0.2,
             verbose=True,
         )
@@ -27,23 +35,114 @@ class SchemaMakerAgent:
         self.chain = self.prompt | self.llm | JsonOutputParser()
 
     async def run(self, schema_payload: dict) -> dict:
-        print(f"Schema payload received: {json.dumps(schema_payload, indent=2, default=str)}")
-        
-        response = await self.chain.ainvoke(
+        columns = schema_payload.get("columns", [])
+        random_records = schema_payload.get("random_records", [])
+
+        batches = self._make_batches(schema_payload)
+        print(
+            f"[SchemaMakerAgent] {schema_payload.get('table_name')}: "
+            f"{len(columns)} columns in {len(batches)} batch(es)"
+        )
+
+        # Batches are independent, so they are described concurrently and
+        # a failed batch is retried on its own
+        semaphore = asyncio.Semaphore(settings.SCHEMA_BATCH_CONCURRENCY)
+
+        async def describe(index: int, batch: dict) -> list[dict]:
+            async with semaphore:
+                return await self._describe_batch(index, batch)
+
+        results = await asyncio.gather(
+            *(describe(i, batch) for i, batch in enumerate(batches))
+        )
+
+        schema = [col for batch_schema in results for col in batch_schema]
+
+        print(f"[SchemaMakerAgent] Final schema generated for {len(schema)} columns")
+
+        return {
+            "schema": schema,
+            "random_records": random_records
+        }
+
+    def _make_batches(self, schema_payload: dict) -> list[dict]:
+        """
+        Split the payload into column batches that fit ``SCHEMA_BATCH_TOKENS``.
+
+        Every batch carries the random records projected onto its own columns, so
+        wide tables do not repeat all values in every prompt.
+        """
+        columns = schema_payload.get("columns", [])
+        random_records = schema_payload.get("random_records", [])
+        table_name = schema_payload.get("table_name")
+
+        base_tokens = estimate_tokens(
+            self.prompt.template + _dumps({"table_name": table_name}),
+            self.model,
+        )
+        budget = settings.SCHEMA_BATCH_TOKENS - base_tokens
+
+        def column_tokens(col: dict) -> int:
+            values = [record.get(col["name"]) for record in random_records]
+            return estimate_tokens(_dumps(col) + _dumps({col["name"]: values}), self.model)
+
+        batches = []
+        current, current_tokens = [], 0
+
+        for col in columns:
+            tokens = column_tokens(col)
+            if current and (
+                current_tokens + tokens > budget
+                or len(current) >= settings.SCHEMA_BATCH_MAX_COLUMNS
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+
+            current.append(col)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        return [
             {
-                "schema_payload": json.dumps(
-                    schema_payload,
-                    indent=2,
-                    default=str
-                )
+                "table_name": table_name,
+                "columns": batch,
+                "random_records": [
+                    {col["name"]: record.get(col["name"]) for col in batch}
+                    for record in random_records
+                ],
             }
-        )
+            for batch in batches
+        ]
 
-        validated_schema = self._validate_and_fix_schema(response, schema_payload)
-        
-        print(f"Final schema generated: {json.dumps(validated_schema, indent=2)}")
-        
-        return validated_schema
+    async def _describe_batch(self, index: int, batch: dict) -> list[dict]:
+        attempts = settings.SCHEMA_BATCH_RETRIES + 1
+        last_error = None
+
+        for attempt in range(1, attempts + 1):
+            try:
+                response = await self.chain.ainvoke(
+                    {"schema_payload": _dumps(batch)}
+                )
+                return self._validate_and_fix_schema(response, batch)["schema"]
+
+            except Exception as e:
+                last_error = e
+                print(f"[SchemaMakerAgent] Batch {index} attempt {attempt}/{attempts} failed: {e}")
+
+        # Keep the columns (and the profiler's types) so the table stays
+        # queryable, just without descriptions
+        print(f"[SchemaMakerAgent] Batch {index} gave up: {last_error}")
+        return [
+            {
+                "column_name": col["name"],
+                "inferred_type": col.get("inferred_type", "string"),
+                "sample_values": col.get("sample_values", []),
+                "description": ""
+            }
+            for col in batch["columns"]
+        ]
 
     def _validate_and_fix_schema(self, response: dict, original_payload: dict) -> dict:
         if not isinstance(response, dict):
@@ -58,17 +157,23 @@ class SchemaMakerAgent:
         if not random_records and "random_records" in original_payload:
             random_records = original_payload["random_records"]
 
-        validated_schema = []
+        described = {}
         for col in schema:
-            validated_col = {
-                "column_name": col.get("column_name") or col.get("name"),
+            name = col.get("column_name") or col.get("name")
+            described[name] = {
+                "column_name": name,
                 "inferred_type": col.get("inferred_type", "string"),
                 "sample_values": col.get("sample_values", []),
                 "description": col.get("description", "")
             }
-            validated_schema.append(validated_col)
+
+        # A response that skips columns is treated like one that failed to parse
+        expected = [col["name"] for col in original_payload.get("columns", [])]
+        missing = [name for name in expected if name not in described]
+        if missing:
+            raise ValueError(f"Schema response is missing columns: {missing}")
 
         return {
-            "schema": validated_schema,
+            "schema": [described[name] for name in expected],
             "random_records": random_records
-        }
\ No newline at end of file
+        }
@@ -5,8 +5,16 @@ from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 import re
+import time
 from typing import List, Dict, Any
 
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+
+from app.utils.token_estimator import estimate_tokens
+from app.utils.sql_validator import get_schema_lookup, normalize_identifiers
+
 PROMPT_PATH = Path(__file__).parent / "prompts" / "sql_answer_agent.md"
 
 
@@ -35,27 +43,43 @@ class SQLAnswerAgent:
         tables: List[Dict[str, Any]],
         user_question: str,
         history_context: list,
+        total_tables: int | None = None,
     ) -> dict:
-        
+        started = time.perf_counter()
+
         tables_context = []
         all_table_names = []
         for table in tables:
             table_name = table["table_name"]
             all_table_names.append(table_name)
             schema_list = table.get("schema", [])
-            tables_context.append({
+            table_context = {
                 "table_name": table_name,
                 "schema": schema_list
-            })
-        
-        response = await self.chain.ainvoke({
-            "tables_context": json.dumps(tables_context, indent=2),
+            }
+            if table.get("join_candidates"):
+                table_context["join_candidates"] = table["join_candidates"]
+            tables_context.append(table_context)
+
+        inputs = {
+            "tables_context": json.dumps(tables_context, separators=(",", ":")),
             "user_question": user_question,
             "history_context": history_context,
-        })
+        }
+        prompt_tokens = estimate_tokens(self.prompt.format(**inputs), "gpt-4o-mini")
+
+        response = await self.chain.ainvoke(inputs)
 
         validated_response = self._validate_response(response, all_table_names, tables)
-        
+
+        validated_response["metrics"] = {
+            "prompt_tokens": prompt_tokens,
+            "tables_in_prompt": len(tables),
+            "tables_total": total_tables or len(tables),
+            "sql_latency_ms": round((time.perf_counter() - started) * 1000),
+        }
+        print(f"[SQLAnswerAgent] Metrics: {validated_response['metrics']}")
+
         return validated_response
 
     def _validate_response(self, response: dict, all_table_names: List[str], tables: List[Dict[str, Any]]) -> dict:
@@ -69,26 +93,54 @@ class SQLAnswerAgent:
         explanation = response.get("explanation", "")
 
         if sql:
-            # Check if at least one valid table name is present in the SQL
-            if not any(table_name in sql for table_name in all_table_names):
-                raise ValueError(f"Generated SQL does not use any of the correct table names: {all_table_names}")
+            sql = self._normalize_identifiers(sql, all_table_names, tables)
 
-            for table in tables:
-                schema = table.get("schema", [])
-                column_names = [col["column_name"] for col in schema]
-                for col_name in column_names:
-                    # Simple regex-based replacement to wrap column names in double quotes if they contain spaces or are mixed case
-                    # This is a bit naive but follows existing pattern
-                    if col_name.lower() in sql.lower() and f'"{col_name}"' not in sql:
-                        # Only replace if it's a whole word to avoid partial matches
-                        sql = re.sub(rf'\b{re.escape(col_name)}\b', f'"{col_name}"', sql, flags=re.IGNORECASE)
-        
         print(f"GENERATED SQL IS AS FOLLOWS: {sql} and IT'S EXPLAINATION IS AS FOLLOWS: {explanation}")
         return {
             "sql": sql,
             "explanation": explanation
         }
-    
+
+    def _normalize_identifiers(
+        self,
+        sql: str,
+        all_table_names: List[str],
+        tables: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Quote table/column identifiers with their exact names, resolved once per
+        identifier on the parsed SQL so literals and aliases are never touched.
+        """
+        try:
+            statements = [
+                statement
+                for statement in sqlglot.parse(sql, read="postgres")
+                if statement is not None
+            ]
+        except SqlglotError as e:
+            # Leave it to the executor's validator/fixer
+            print(f"[SQLAnswerAgent] Could not parse generated SQL: {e}")
+            if not any(table_name in sql for table_name in all_table_names):
+                raise ValueError(f"Generated SQL does not use any of the correct table names: {all_table_names}")
+            return sql
+
+        lookup = get_schema_lookup(tables)
+
+        referenced = {
+            table.name
+            for statement in statements
+            for table in statement.find_all(exp.Table)
+            if lookup.table(table.name)
+        }
+        if not referenced:
+            raise ValueError(f"Generated SQL does not use any of the correct table names: {all_table_names}")
+
+        changed = [normalize_identifiers(statement, lookup) for statement in statements]
+        if not any(changed):
+            return sql
+
+        return ";\n".join(statement.sql(dialect="postgres") for statement in statements)
+
 
 if __name__ == "__main__":
     import asyncio
@@ -1,22 +1,53 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
-from sqlalchemy.exc import ProgrammingError, DatabaseError
-from datetime import date, datetime
-from decimal import Decimal
+from sqlalchemy.exc import ProgrammingError, DatabaseError, DBAPIError
 from typing import Dict, Any, List
+import json
+
+import sqlglot
+from sqlglot import exp
+
+from app.core.config import settings
+from app.utils.query_result import QueryResult
+from app.utils.result_cache import canonicalize_sql, get_result_cache
+
+
+class QueryCostError(Exception):
+    def __init__(self, cost: float, max_cost: float, plan_summary: str):
+        self.cost = cost
+        self.plan_summary = plan_summary
+        super().__init__(
+            f"Query rejected: estimated cost {cost:,.0f} exceeds the limit of {max_cost:,.0f}. "
+            f"Rewrite it to read less data (filter earlier, avoid cross joins, aggregate before joining).\n"
+            f"Plan:\n{plan_summary}"
+        )
+
+
+def summarize_plan(plan: dict, max_nodes: int = 15) -> str:
+    """Compact, indented outline of an EXPLAIN (FORMAT JSON) plan."""
+    lines = []
+
+    def visit(node: dict, depth: int):
+        if len(lines) >= max_nodes:
+            return
+        relation = f" on {node['Relation Name']}" if node.get("Relation Name") else ""
+        condition = node.get("Join Filter") or node.get("Hash Cond") or node.get("Filter") or ""
+        condition = f" [{condition}]" if condition else ""
+        lines.append(
+            f"{'  ' * depth}{node['Node Type']}{relation}{condition} "
+            f"(cost={node.get('Total Cost', 0):,.0f} rows={node.get('Plan Rows', 0):,})"
+        )
+        for child in node.get("Plans", []):
+            visit(child, depth + 1)
+
+    visit(plan, 0)
+    return "\n".join(lines)
 
 
 class QueryExecutorTool:
     def __init__(self, max_rows: int | None = None):
         self.max_rows = max_rows
 
-    def _json_safe(self, value):
-        if isinstance(value, (date, datetime)):
-            return value.isoformat()
-        if isinstance(value, Decimal):
-            return float(value)
-        return value
-
     def _validate_sql(self, sql: str) -> None:
         if not sql or not sql.strip():
             raise ValueError("Empty SQL query")
@@ -31,6 +62,126 @@ class QueryExecutorTool:
         if any(keyword in normalized for keyword in blocked_keywords):
             raise ValueError(f"Unsafe SQL detected: contains blocked keyword")
 
+    def _limit_sql(self, sql: str) -> str | None:
+        """
+        Push ``LIMIT max_rows + 1`` into the outermost query so Postgres stops
+        early; the extra row tells us whether the result was truncated. Returns
+        None when the query cannot be rewritten.
+        """
+        limit = self.max_rows + 1
+
+        try:
+            statements = [s for s in sqlglot.parse(sql, read="postgres") if s is not None]
+        except sqlglot.errors.SqlglotError:
+            return None
+
+        if len(statements) != 1 or not isinstance(statements[0], exp.Query):
+            return None
+
+        expression = statements[0]
+
+        # Keep a stricter limit the query already has
+        existing = expression.args.get("limit")
+        if isinstance(existing, exp.Limit):
+            value = existing.expression
+        elif isinstance(existing, exp.Fetch):
+            value = existing.args.get("count")
+        else:
+            value = None
+
+        if isinstance(value, exp.Literal) and value.is_int and int(value.this) <= limit:
+            return sql
+
+        return expression.limit(limit).sql(dialect="postgres")
+
+    async def _explain(self, sql: str, session: AsyncSession) -> dict:
+        result = await session.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+    async def _check_cost(self, sql: str, session: AsyncSession) -> None:
+        """Reject ``sql`` before it runs when the planner expects it to be too expensive."""
+        if not settings.QUERY_MAX_COST:
+            return
+
+        plan = await self._explain(sql, session)
+        cost = plan.get("Total Cost", 0)
+
+        if cost > settings.QUERY_MAX_COST:
+            raise QueryCostError(cost, settings.QUERY_MAX_COST, summarize_plan(plan))
+
+    async def _fetch_rows(self, sql: str, session: AsyncSession) -> tuple[list, list, bool]:
+        """Run ``sql`` and return (columns, rows, truncated), reading at most max_rows + 1 rows."""
+        if self.max_rows is None:
+            await self._check_cost(sql, session)
+            result = await session.execute(text(sql))
+            return list(result.keys()), result.fetchall(), False
+
+        limited_sql = self._limit_sql(sql)
+        await self._check_cost(limited_sql or sql, session)
+
+        if limited_sql is not None:
+            result = await session.execute(text(limited_sql))
+            columns = list(result.keys())
+            rows = result.fetchmany(self.max_rows + 1)
+        else:
+            # Could not rewrite it, so read through a server-side cursor instead
+            result = await session.stream(text(sql))
+            columns = list(result.keys())
+            rows = await result.fetchmany(self.max_rows + 1)
+            await result.close()
+
+        truncated = len(rows) > self.max_rows
+        return columns, rows[:self.max_rows], truncated
+
+    async def _table_versions(
+        self,
+        session: AsyncSession,
+        tables: List[str]
+    ) -> Dict[str, str] | None:
+        """
+        Version stamp per table from the catalog: a recreated, rewritten or modified
+        table gets a new stamp. None when a table does not exist.
+        """
+        if not tables:
+            return {}
+
+        result = await session.execute(
+            text("""
+                SELECT
+                    c.relname,
+                    c.oid::text || ':' || c.relfilenode::text || ':' ||
+                    COALESCE(s.n_tup_ins + s.n_tup_upd + s.n_tup_del, 0)::text
+                FROM pg_class c
+                LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+                WHERE c.relname = ANY(:tables)
+                  AND pg_table_is_visible(c.oid)
+            """),
+            {"tables": tables},
+        )
+        versions = {name: version for name, version in result.fetchall()}
+
+        if len(versions) != len(tables):
+            return None
+        return versions
+
+    async def _cache_key(self, sql: str, session: AsyncSession) -> str | None:
+        if not settings.RESULT_CACHE_ENABLED:
+            return None
+
+        canonical = canonicalize_sql(sql)
+        if canonical is None:
+            return None
+
+        canonical_sql, tables = canonical
+        versions = await self._table_versions(session, tables)
+        if versions is None:
+            return None
+
+        return get_result_cache().make_key(canonical_sql, versions, self.max_rows)
+
     async def execute(
         self,
         sql: str,
@@ -39,41 +190,83 @@ class QueryExecutorTool:
         try:
             self._validate_sql(sql)
 
+            # Everything below runs in one transaction, so the timeout only
+            # applies to this execution and is dropped by the rollback
+            await session.execute(
+                text("SELECT set_config('statement_timeout', :timeout, true)"),
+                {"timeout": str(settings.QUERY_STATEMENT_TIMEOUT_MS)},
+            )
+
+            # Uploaded tables do not change after ingestion, so a result stays
+            # valid until the table's version stamp moves
+            cache_key = await self._cache_key(sql, session)
+            if cache_key:
+                cached = await get_result_cache().get(cache_key)
+                if cached is not None:
+                    print(f"[QueryExecutorTool] Result cache hit: {sql[:150]}...")
+                    return {
+                        **cached,
+                        "data": QueryResult.from_payload(cached["data"]),
+                        "cached": True,
+                    }
+
             print(f"[QueryExecutorTool] Executing: {sql[:150]}...")
 
-            result = await session.execute(text(sql))
-            rows = result.fetchall()
-            columns = list(result.keys())
+            columns, rows, truncated = await self._fetch_rows(sql, session)
 
-            if self.max_rows is not None and len(rows) > self.max_rows:
-                rows = rows[:self.max_rows]
+            # Column arrays instead of per-cell conversion; JSON rows are built
+            # only if a consumer asks for them
+            data = QueryResult.from_rows(columns, rows)
 
-            return {
+            payload = {
                 "success": True,
                 "columns": columns,
-                "rows": [
-                    [self._json_safe(value) for value in row]
-                    for row in rows
-                ],
-                "row_count": len(rows),
+                "data": data,
+                "row_count": data.row_count,
+                "truncated": truncated,
                 "error": None
             }
 
-        except (ProgrammingError, DatabaseError) as e:
-            await session.rollback()
-            return {
-                "success": False,
-                "columns": [],
-                "rows": [],
-                "row_count": 0,
-                "error": str(e)
-            }
+            if cache_key:
+                await get_result_cache().set(cache_key, {**payload, "data": data.to_payload()})
+
+            return payload
+
+        except QueryCostError as e:
+            print(f"[QueryExecutorTool] Rejected by cost guard: {e.cost:,.0f}")
+            return self._failure(str(e))
+
+        except (ProgrammingError, DatabaseError, DBAPIError) as e:
+            error = str(e)
+
+            if "statement timeout" in error:
+                await session.rollback()
+                error = (
+                    f"Query cancelled after the {settings.QUERY_STATEMENT_TIMEOUT_MS} ms statement timeout. "
+                    f"Rewrite it to read less data.\nPlan:\n{await self._plan_summary(sql, session)}"
+                )
+
+            return self._failure(error)
+
         except Exception as e:
+            return self._failure(f"Unexpected error: {str(e)}")
+
+        finally:
+            # Read-only work: ending the transaction drops SET LOCAL and the snapshot
             await session.rollback()
-            return {
-                "success": False,
-                "columns": [],
-                "rows": [],
-                "row_count": 0,
-                "error": f"Unexpected error: {str(e)}"
-            }
\ No newline at end of file
+
+    async def _plan_summary(self, sql: str, session: AsyncSession) -> str:
+        try:
+            return summarize_plan(await self._explain(self._limit_sql(sql) or sql, session))
+        except Exception as e:
+            return f"(plan unavailable: {e})"
+
+    def _failure(self, error: str) -> Dict[str, Any]:
+        return {
+            "success": False,
+            "columns": [],
+            "data": None,
+            "row_count": 0,
+            "truncated": False,
+            "error": error
+        }
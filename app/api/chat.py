@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from typing import List, Any
+import asyncio
+import time
 
 from app.schemas.chat import (
     ThreadBase,
     ThreadResponse,
     MessageCreate,
     MessageResponse,
+    SQLCacheStatsResponse,
+    PoolStatsResponse,
 )
-from app.db.postgres import get_postgres_session
+from app.db.postgres import get_postgres_read_session, get_pool_stats
 from app.models.chat import Thread
 from app.models.user import User
 from app.auth.dependencies import get_current_user
@@ -27,61 +31,175 @@ from app.services.message_service import (
     get_db_id,
 )
 from app.utils.unified_memory_manager import UnifiedMemoryManager
+from app.utils.schema_index import get_schema_index
+from app.utils.result_summarizer import summarize_result
+from app.utils.token_estimator import estimate_tokens
+from app.utils.pipeline_timer import PipelineTimer
+from app.core.config import settings
+from app.agents.fast_path_agent import FastPathAgent
 from app.agents.sql_answer_agent import SQLAnswerAgent
 from app.agents.executor_agent import ExecutorAgent
 from app.agents.response_agent import ResponseAgent
 from app.services.redis_service import publish_event
+from app.services.sql_cache_service import (
+    get_cached_sql,
+    store_cached_sql,
+    cache_context_key,
+    get_sql_cache_stats,
+)
 
 router = APIRouter()
 
 
-async def process_bot_message(
-    message_in: MessageCreate,
+async def _publish_answer(thread_id: str, bot_message_id: str, answer: str):
+    """Send a complete, non-streamed answer and store it on the bot message."""
+    for event_type in ("message_start", "message_end"):
+        await publish_event(
+            thread_id=thread_id,
+            bot_message_id=bot_message_id,
+            event={
+                "type": event_type,
+                "content": answer,
+            },
+        )
+
+    await update_message_content(
+        bot_message_id,
+        answer,
+    )
+
+
+async def _publish_status(
     thread_id: str,
-    user_id: str,
     bot_message_id: str,
+    stage: str,
+    content: str,
+    timer: PipelineTimer,
 ):
     await publish_event(
         thread_id=thread_id,
         bot_message_id=bot_message_id,
         event={
             "type": "status",
-            "stage": "thinking",
-            "content": "Understanding your question…",
+            "stage": stage,
+            "content": content,
+            "timings": timer.snapshot(),
         },
     )
 
-    memory_manager = UnifiedMemoryManager(thread_id=thread_id)
-
-    history_context = await memory_manager.get_history_context(
-        message_in.content
-    )
 
-    # Fetch all table mappings for the user to support JOINs
-    tables = await get_all_table_mappings(
-        user_id=user_id,
+async def process_bot_message(
+    message_in: MessageCreate,
+    thread_id: str,
+    user_id: str,
+    bot_message_id: str,
+):
+    """
+    Answer a chat message. History and mappings load concurrently, the stored
+    history summary is fetched during the SQL cache lookup, and the response
+    agent is prepared while the query runs. Stage timings go out with every
+    status event.
+    """
+    timer = PipelineTimer()
+    question = message_in.content
+
+    await _publish_status(
+        thread_id, bot_message_id, "thinking", "Understanding your question…", timer
     )
 
-    sql_agent = SQLAnswerAgent(bot_message_id=bot_message_id)
+    memory_manager = UnifiedMemoryManager(thread_id=thread_id)
 
-    await publish_event(
-        thread_id=thread_id,
-        bot_message_id=bot_message_id,
-        event={
-            "type": "status",
-            "stage": "sql",
-            "content": "Generating query…",
-        },
+    # History and mappings do not depend on each other
+    messages_task = asyncio.create_task(
+        timer.timed("history", memory_manager.load_messages())
     )
+    try:
+        # Fetch all table mappings for the user to support JOINs
+        all_tables = await timer.timed("mappings", get_all_table_mappings(
+            user_id=user_id,
+        ))
+    except Exception:
+        messages_task.cancel()
+        raise
+
+    # Row counts, column lists and category values need no LLM at all
+    if settings.FAST_PATH_ENABLED:
+        fast_path = FastPathAgent()
+        fast_match = fast_path.match(question, all_tables)
+        if fast_match:
+            async for session in get_postgres_read_session():
+                answer = await timer.timed(
+                    "fast_path", fast_path.run(fast_match, user_id, session)
+                )
+
+            if answer:
+                messages_task.cancel()
+                print(
+                    f"[process_bot_message] Fast path ({fast_match['intent']}) answered in "
+                    f"{timer.elapsed_ms():.0f} ms"
+                )
+                await _publish_answer(thread_id, bot_message_id, answer)
+                await memory_manager.remember(question, answer)
+                return
+
+    messages = await messages_task
+    recent_context = memory_manager.recent_context(messages)
+
+    # Only the tables relevant to the question (plus join partners) go in the prompt
+    schema_index = get_schema_index(user_id, all_tables)
+    tables = schema_index.select_tables(question, recent_context)
+
+    # The stored rolling summary is fetched while the SQL cache is checked
+    summary_task = None
+    if len(messages) > memory_manager.max_messages:
+        summary_task = asyncio.create_task(
+            timer.timed("history_summary", memory_manager.summary_context(messages))
+        )
 
-    sql_response = await sql_agent.run(
-        tables=tables,
-        user_question=message_in.content,
-        history_context=history_context,
-    )
+    # Only strictly standalone questions share cached SQL across threads,
+    # follow-ups ("and per month?") are cached per conversation
+    sql_cache_context = cache_context_key(question, recent_context)
+    cached_sql = await timer.timed("sql_cache", get_cached_sql(
+        user_id,
+        question,
+        tables,
+        context_key=sql_cache_context,
+    ))
+
+    if cached_sql:
+        if summary_task:
+            summary_task.cancel()
+
+        # SQL that already executed against these exact table versions
+        sql = cached_sql.sql
+        explanation = cached_sql.explanation
+        cached_queries = cached_sql.queries
+    else:
+        history_context = await summary_task if summary_task else recent_context
+
+        sql_agent = SQLAnswerAgent(bot_message_id=bot_message_id)
+
+        await _publish_status(
+            thread_id, bot_message_id, "sql", "Generating query…", timer
+        )
+
+        sql_response = await timer.timed("sql", sql_agent.run(
+            tables=tables,
+            user_question=question,
+            history_context=history_context,
+            total_tables=len(all_tables),
+        ))
+
+        print(
+            f"[process_bot_message] Time to first SQL: "
+            f"{timer.elapsed_ms():.0f} ms, "
+            f"{sql_response['metrics']['prompt_tokens']} prompt tokens, "
+            f"{len(tables)}/{len(all_tables)} tables"
+        )
 
-    sql = sql_response.get("sql")
-    explanation = sql_response.get("explanation", "")
+        sql = sql_response.get("sql")
+        explanation = sql_response.get("explanation", "")
+        cached_queries = None
 
     if not sql:
         await publish_event(
@@ -100,71 +218,115 @@ async def process_bot_message(
         max_retries=5,
     )
 
-    await publish_event(
-        thread_id=thread_id,
-        bot_message_id=bot_message_id,
-        event={
-            "type": "status",
-            "stage": "execution",
-            "content": "Running query…",
-        },
+    await _publish_status(
+        thread_id, bot_message_id, "execution", "Running query…", timer
     )
 
-    async for session in get_postgres_session():
-        execution_result = await executor.run(
-            sql=sql,
-            explanation=explanation,
-            session=session,
-            tables=tables,
-        )
-
-
-    response_agent = ResponseAgent()
-    full_response = ""
+    # The response agent (client and prompt) is set up while the query runs
+    response_agent_task = asyncio.create_task(asyncio.to_thread(ResponseAgent))
+    try:
+        async for session in get_postgres_read_session():
+            execution_result = await timer.timed("execution", executor.run(
+                sql=sql,
+                explanation=explanation,
+                session=session,
+                tables=tables,
+                queries=cached_queries,
+            ))
+
+        # Totals, rankings and trends are computed here instead of by the LLM
+        result_summary = None
+        results = execution_result.get("results") or []
+        first_result = results[0]["result"] if results else {}
+        if first_result.get("success"):
+            result_summary = await timer.timed("summarize", asyncio.to_thread(
+                summarize_result,
+                first_result["data"],
+                settings.RESPONSE_RESULT_MAX_TOKENS,
+            ))
+            print(
+                f"[process_bot_message] Summarized {first_result['row_count']} rows in "
+                f"{timer.stages['summarize']:.0f} ms, "
+                f"~{estimate_tokens(result_summary, 'gpt-4o-mini')} prompt tokens"
+            )
+
+        response_agent = await response_agent_task
+        full_response = ""
 
-    await publish_event(
-        thread_id=thread_id,
-        bot_message_id=bot_message_id,
-        event={
-            "type": "message_start",
-            "content": "",
-        }
-    )
+        await publish_event(
+            thread_id=thread_id,
+            bot_message_id=bot_message_id,
+            event={
+                "type": "message_start",
+                "content": "",
+            }
+        )
 
-    async for token in response_agent.stream(
-        sql_query=sql,
-        user_question=message_in.content,
-        execution_result=execution_result,
-    ):
-        full_response += token
+        response_started = time.perf_counter()
+
+        async for token in response_agent.stream(
+            sql_query=sql,
+            user_question=question,
+            execution_result=execution_result,
+            result_summary=result_summary,
+        ):
+            if not full_response:
+                timer.stages["first_token"] = round((time.perf_counter() - response_started) * 1000, 1)
+                print(
+                    f"[process_bot_message] Time to first token: "
+                    f"{timer.elapsed_ms():.0f} ms"
+                )
+            full_response += token
+
+            await publish_event(
+                thread_id=thread_id,
+                bot_message_id=bot_message_id,
+                event ={
+                    "type": "message_start",
+                    "content": token,
+                }
+            )
+
+        timer.stages["response"] = round((time.perf_counter() - response_started) * 1000, 1)
 
         await publish_event(
             thread_id=thread_id,
             bot_message_id=bot_message_id,
-            event ={
-                "type": "message_start",
-                "content": token,
+            event={
+                "type": "message_end",
+                "content": full_response,
+                "timings": timer.snapshot(),
             }
         )
-    
-    await publish_event(
-        thread_id=thread_id,
-        bot_message_id=bot_message_id,
-        event={
-            "type": "message_end",
-            "content": full_response,
-        }
-    )
 
-    await update_message_content(
-        bot_message_id,
-        full_response,
-    )
+        # SQL is only cached once its answer has been delivered
+        cache_store = []
+        if cached_sql is None and execution_result.get("all_succeeded"):
+            cache_store.append(store_cached_sql(
+                user_id,
+                question,
+                tables,
+                sql,
+                explanation,
+                [item["result"]["sql"] for item in execution_result["results"]],
+                context_key=sql_cache_context,
+            ))
+
+        await asyncio.gather(
+            update_message_content(
+                bot_message_id,
+                full_response,
+            ),
+            memory_manager.remember(question, full_response),
+            *cache_store,
+        )
 
-    memory_manager.update_memory(
-        user_query=message_in.content,
-        ai_response=full_response,
-    )
+    finally:
+        # A failure above must not leave the set-up task unawaited
+        response_agent_task.cancel()
+        await asyncio.gather(response_agent_task, return_exceptions=True)
+
+    print(f"[process_bot_message] Stage timings: {timer.snapshot()}")
 
 
 
@@ -248,6 +410,20 @@ async def create_new_message(
     ]
 
 
+@router.get("/metrics/sql-cache", response_model=SQLCacheStatsResponse)
+async def sql_cache_metrics(
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    return await get_sql_cache_stats()
+
+
+@router.get("/metrics/postgres-pool", response_model=PoolStatsResponse)
+async def postgres_pool_metrics(
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    return get_pool_stats()
+
+
 @router.get("/threads/{thread_id}/messages", response_model=List[MessageResponse])
 async def get_messages(
     thread_id: str,
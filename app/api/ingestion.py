@@ -1,15 +1,20 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Depends
 from datetime import datetime
 from app.auth.dependencies import get_current_user
-from app.schemas.ingestion import IngestionResponse, SchemaViewResponse, SchemaUpdateRequest
-from app.services.ingestion_service import ingest_files
-from app.db.postgres import get_postgres_session
+from app.schemas.ingestion import (
+    IngestionResponse,
+    IngestionStatusResponse,
+    SchemaViewResponse,
+    SchemaUpdateRequest,
+)
+from app.services.ingestion_queue_service import enqueue_ingestion
+from app.utils.file_parser import get_extension
 from app.models.user import User
-from app.services.schema_extraction_service import extract_schema_payload
-from app.services.schema_maker_service import generate_and_store_schema
 from app.services.schema_management_service import (
     get_schema_for_user,
     get_all_schemas_for_user,
+    get_ingestion_job,
     update_schema_descriptions,
 )
 from app.services.message_service import get_db_id
@@ -24,35 +29,53 @@ router =APIRouter(
 async def upload_file(
     input_files: List[UploadFile] = File(...),
     current_user=Depends(get_current_user),
-    pg_session=Depends(get_postgres_session),
 ):
-    responses = []
+    # Reject unsupported files up front instead of failing them in the worker
     for input_file in input_files:
-        mapping = await ingest_files(
-            input_file=input_file,
-            user=current_user,
-            pg_session=pg_session
-        )
-
-        schema_payload = await extract_schema_payload(
-            pg_session,
-            mapping.table_name
-        )
+        get_extension(input_file)
 
-        await generate_and_store_schema(
-            mapping=mapping,
-            schema_payload=schema_payload
+    mappings = await asyncio.gather(
+        *(
+            enqueue_ingestion(input_file, current_user)
+            for input_file in input_files
         )
+    )
 
-        responses.append(IngestionResponse(
-            mapping_id=str(mapping.id),   
-            object_id=mapping.db_id,         
+    return [
+        IngestionResponse(
+            mapping_id=str(mapping.id),
+            object_id=mapping.db_id,
             table_name=mapping.table_name,
             file_name=mapping.file_name,
-            created_at=datetime.utcnow() 
-        ))
+            status=mapping.schema_status,
+            created_at=datetime.utcnow()
+        )
+        for mapping in mappings
+    ]
 
-    return responses
+
+@router.get(
+    "/file/{mapping_id}",
+    response_model=IngestionStatusResponse,
+)
+async def get_ingestion_status(
+    mapping_id: str,
+    current_user=Depends(get_current_user),
+):
+    mapping = await get_ingestion_job(
+        user_id=str(current_user.id),
+        mapping_id=mapping_id,
+    )
+
+    return IngestionStatusResponse(
+        mapping_id=str(mapping.id),
+        object_id=mapping.db_id,
+        table_name=mapping.table_name,
+        file_name=mapping.file_name,
+        schema_status=mapping.schema_status,
+        error=mapping.error,
+        updated_at=mapping.updated_at,
+    )
 
 
 @router.get(
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -16,6 +16,17 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     POSTGRES_PORT: int
 
+    POSTGRES_POOL_SIZE: int = 10
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT: int = 30
+    POSTGRES_POOL_RECYCLE: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+
+    # Chat queries and profiling read through their own pool, optionally on a replica
+    POSTGRES_READ_URL: Optional[str] = None
+    POSTGRES_READ_POOL_SIZE: int = 10
+    POSTGRES_READ_MAX_OVERFLOW: int = 10
+
     MONGO_URI: str
     MONGO_DB_NAME: str
 
@@ -36,6 +47,59 @@ class Settings(BaseSettings):
 
     OPENAI_API_KEY: str
 
+    INGEST_CHUNK_SIZE: int = 50_000
+    INGEST_STREAMING: bool = True
+    INGEST_INFER_CHUNKS: int = 2
+    INGEST_MAX_CONCURRENCY: int = 4
+    INGEST_QUEUE: str = "insighta:ingestion_jobs"
+    INGEST_UPLOAD_BUCKET: str = "ingestion_uploads"
+    INGEST_MAX_ATTEMPTS: int = 3
+    INGEST_STALE_AFTER_SECONDS: int = 1800
+    INGEST_HEARTBEAT_SECONDS: int = 10
+    INGEST_HEARTBEAT_TTL_SECONDS: int = 30
+
+    PROCESS_POOL_WORKERS: int = 2
+
+    SCHEMA_MODEL: str = "gpt-4o-mini"
+    SCHEMA_BATCH_TOKENS: int = 6000
+    SCHEMA_BATCH_MAX_COLUMNS: int = 40
+    SCHEMA_BATCH_CONCURRENCY: int = 4
+    SCHEMA_BATCH_RETRIES: int = 2
+    SCHEMA_CACHE_ENABLED: bool = True
+    SCHEMA_CACHE_TTL_DAYS: int = 90
+
+    SCHEMA_INDEX_TOP_K: int = 3
+    SCHEMA_INDEX_MAX_JOIN_TABLES: int = 2
+    SCHEMA_INDEX_MIN_SCORE: float = 0.5
+    SCHEMA_INDEX_EMBEDDINGS: bool = True
+    SCHEMA_INDEX_EMBEDDING_WEIGHT: float = 0.5
+
+    SQL_CACHE_ENABLED: bool = True
+    SQL_CACHE_TTL_DAYS: int = 30
+    SQL_CACHE_SIMILARITY_MATCHING: bool = False
+    SQL_CACHE_SIMILARITY: float = 0.85
+    SQL_CACHE_SIMILARITY_CANDIDATES: int = 200
+    SQL_CACHE_METRICS_KEY: str = "insighta:metrics:sql_cache"
+
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESULT_CACHE_COMPRESS_MIN_BYTES: int = 16 * 1024
+    RESULT_CACHE_REDIS: bool = False
+    RESULT_CACHE_REDIS_TTL: int = 3600
+    RESULT_CACHE_REDIS_PREFIX: str = "insighta:results:"
+
+    QUERY_STATEMENT_TIMEOUT_MS: int = 30_000
+    QUERY_MAX_COST: float = 10_000_000
+    EXECUTOR_MAX_PARALLEL_QUERIES: int = 4
+    FAST_PATH_ENABLED: bool = True
+    RESPONSE_RESULT_MAX_TOKENS: int = 2000
+
+    TABLE_INDEX_ENABLED: bool = True
+    TABLE_INDEX_MIN_ROWS: int = 10_000
+    TABLE_INDEX_MAX_INDEXES: int = 6
+    TABLE_INDEX_MAX_DISTINCT_RATIO: float = 0.2
+    TABLE_INDEX_BRIN_MIN_CORRELATION: float = 0.9
+
     REDIS_HOST: str
     REDIS_PORT: str
     REDIS_CHANNEL: str
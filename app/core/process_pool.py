@@ -0,0 +1,49 @@
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+process_pool: ProcessPoolExecutor | None = None
+
+
+def start_process_pool() -> ProcessPoolExecutor | None:
+    global process_pool
+
+    if process_pool is None and settings.PROCESS_POOL_WORKERS > 0:
+        process_pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESS_POOL_WORKERS,
+            # Forking a process that already runs the event loop, Motor and
+            # Redis threads is unsafe, so workers start from a clean interpreter
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    return process_pool
+
+
+def shutdown_process_pool():
+    global process_pool
+
+    if process_pool is not None:
+        process_pool.shutdown(wait=True, cancel_futures=True)
+        process_pool = None
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous pandas work without blocking the event loop.
+
+    Uses the process pool started in the app lifespan. When no pool is running
+    (pool disabled, scripts, workers outside the app) it falls back to a thread.
+    """
+    call = functools.partial(func, *args, **kwargs)
+
+    if process_pool is None:
+        return await asyncio.to_thread(call)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(process_pool, call)
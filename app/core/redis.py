@@ -15,3 +15,20 @@ async def get_redis() -> redis.Redis:
         )
 
     return redis_client
+
+
+binary_redis_client: redis.Redis | None = None
+
+
+async def get_binary_redis() -> redis.Redis:
+    """Client without response decoding, for compressed payloads."""
+    global binary_redis_client
+
+    if binary_redis_client is None:
+        binary_redis_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            decode_responses=False,
+        )
+
+    return binary_redis_client
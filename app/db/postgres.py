@@ -1,10 +1,14 @@
+import time
 from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     create_async_engine,
     async_sessionmaker,
 )
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
@@ -16,9 +20,75 @@ DATABASE_URL = (
     f"{settings.POSTGRES_DB}"
 )
 
-engine = create_async_engine(
+READ_DATABASE_URL = settings.POSTGRES_READ_URL or DATABASE_URL
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = (time.perf_counter() - started) * 1000
+            self.checkouts += 1
+            self.total_wait_ms += waited
+            self.max_wait_ms = max(self.max_wait_ms, waited)
+
+    def stats(self) -> dict:
+        capacity = self.size() + self._max_overflow
+        checked_out = self.checkedout()
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": checked_out,
+            "idle": self.checkedin(),
+            "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.checkout_timeouts,
+            "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+def _create_engine(url: str, pool_size: int, max_overflow: int, **kwargs) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+        pool_pre_ping=settings.POSTGRES_POOL_PRE_PING,
+        **kwargs,
+    )
+
+
+engine = _create_engine(
     DATABASE_URL,
-    echo=False,
+    settings.POSTGRES_POOL_SIZE,
+    settings.POSTGRES_MAX_OVERFLOW,
+)
+
+# Separate pool so chat queries never wait behind ingestion writes; sessions
+# are read-only at the server even when no replica is configured
+read_engine = _create_engine(
+    READ_DATABASE_URL,
+    settings.POSTGRES_READ_POOL_SIZE,
+    settings.POSTGRES_READ_MAX_OVERFLOW,
+    connect_args={"server_settings": {"default_transaction_read_only": "on"}},
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -26,6 +96,21 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    expire_on_commit=False,
+)
+
 async def get_postgres_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_postgres_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with ReadSessionLocal() as session:
+        yield session
+
+def get_pool_stats() -> dict:
+    return {
+        "primary": engine.pool.stats(),
+        "read": read_engine.pool.stats(),
+    }
@@ -0,0 +1,121 @@
+import re
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.utils.datatype_mapper import CATEGORY_MAX_DISTINCT
+
+TEMPORAL_TYPES = {"DATE", "TIMESTAMP"}
+
+# Column names that usually identify a row in another table
+KEY_COLUMN = re.compile(r"(^|[_\s])(id|code|key|number|no)$", re.IGNORECASE)
+
+
+def choose_indexes(column_profile: dict, correlations: dict[str, float]) -> list[dict]:
+    """
+    Pick indexes for a freshly loaded table from its column profile.
+
+    - DATE/TIMESTAMP columns get BRIN when the rows are stored in (roughly) date
+      order, otherwise btree.
+    - Key-like columns (``customer_id``, ``order_no``), low-to-mid cardinality text
+      columns and low cardinality integer columns (years, ratings, status codes),
+      the usual WHERE/GROUP BY/JOIN targets, get btree. Other integers are
+      measures (amounts, counts) and are not indexed.
+
+    Returns [{"column", "method", "reason"}, ...] ordered by priority.
+    """
+    row_count = column_profile.get("row_count") or 0
+    if row_count < settings.TABLE_INDEX_MIN_ROWS:
+        return []
+
+    temporal, keys, filters = [], [], []
+
+    for column, stats in column_profile.get("columns", {}).items():
+        pg_type = stats["pg_type"]
+        distinct = stats.get("distinct_count") or 0
+
+        if (stats.get("null_fraction") or 0) > 0.9 or distinct < 2 or pg_type == "BOOLEAN":
+            continue
+
+        if pg_type in TEMPORAL_TYPES:
+            correlation = abs(correlations.get(column) or 0)
+            if correlation >= settings.TABLE_INDEX_BRIN_MIN_CORRELATION:
+                temporal.append({"column": column, "method": "brin", "reason": f"date column, correlation {correlation:.2f}"})
+            else:
+                temporal.append({"column": column, "method": "btree", "reason": "date column, unordered"})
+            continue
+
+        if pg_type not in ("TEXT", "BIGINT"):
+            continue  # measures, not filters
+
+        if KEY_COLUMN.search(column):
+            keys.append({"column": column, "method": "btree", "reason": f"key column, {distinct} distinct"})
+        elif pg_type == "BIGINT" and distinct > CATEGORY_MAX_DISTINCT:
+            continue  # amounts and counts, not filters
+        elif distinct <= row_count * settings.TABLE_INDEX_MAX_DISTINCT_RATIO:
+            filters.append((distinct, {"column": column, "method": "btree", "reason": f"filter column, {distinct} distinct"}))
+
+    # More selective filter columns first
+    filters = [index for _, index in sorted(filters, key=lambda item: -item[0])]
+
+    return (keys + temporal + filters)[:settings.TABLE_INDEX_MAX_INDEXES]
+
+
+async def get_column_correlations(session: AsyncSession, table_name: str) -> dict[str, float]:
+    """Physical-order correlation per column from ``pg_stats``; needs a prior ANALYZE."""
+    result = await session.execute(
+        text("""
+            SELECT attname, correlation
+            FROM pg_stats
+            WHERE tablename = :table_name
+        """),
+        {"table_name": table_name}
+    )
+    return {row.attname: row.correlation for row in result.fetchall()}
+
+
+async def optimize_table(
+    session: AsyncSession,
+    table_name: str,
+    column_profile: dict
+) -> list[dict]:
+    """
+    ANALYZE a freshly loaded table and create the indexes chosen by
+    ``choose_indexes``. Returns the indexes that were created.
+    """
+    await session.execute(text(f'ANALYZE "{table_name}"'))
+
+    if not settings.TABLE_INDEX_ENABLED:
+        await session.commit()
+        return []
+
+    correlations = await get_column_correlations(session, table_name)
+    columns = list(column_profile.get("columns", {}))
+    created = []
+
+    for index in choose_indexes(column_profile, correlations):
+        # Positional names stay under the 63 character identifier limit
+        name = f"{table_name}_{index['method']}_{columns.index(index['column'])}"
+        column = index["column"].replace('"', '""')
+
+        try:
+            async with session.begin_nested():
+                await session.execute(text(
+                    f'CREATE INDEX IF NOT EXISTS "{name}" '
+                    f'ON "{table_name}" USING {index["method"]} ("{column}")'
+                ))
+        except Exception as e:
+            print(f"[optimize_table] {table_name}: could not index {index['column']!r}: {e}")
+            continue
+
+        created.append({**index, "name": name, "created_at": datetime.utcnow()})
+
+    await session.commit()
+
+    print(
+        f"[optimize_table] {table_name}: analyzed, "
+        f"{len(created)} index(es) on {[index['column'] for index in created]}"
+    )
+    return created
@@ -1,3 +1,4 @@
+import json
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
@@ -33,54 +34,155 @@ async def get_table_schema(
         for row in result.fetchall()
     ]
 
-async def get_column_samples(
+
+# Column types Postgres cannot MIN()/MAX()
+UNORDERED_TYPES = {"boolean", "json", "jsonb", "ARRAY", "USER-DEFINED", "bytea", "xml"}
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+async def get_sample_percent(
+    session: AsyncSession,
+    table_name: str,
+    sample_pages: int = 1000
+) -> float:
+    """
+    Percentage of the table's pages to read so a TABLESAMPLE touches roughly
+    ``sample_pages`` pages. Uses the on-disk size, which is accurate even before
+    the table has been ANALYZEd.
+    """
+    result = await session.execute(
+        text(
+            "SELECT pg_relation_size(CAST(:table_name AS regclass)) "
+            "/ current_setting('block_size')::bigint"
+        ),
+        {"table_name": _quote(table_name)}
+    )
+    pages = result.scalar() or 0
+
+    if pages <= sample_pages:
+        return 100.0
+
+    return 100.0 * sample_pages / pages
+
+
+async def get_table_profile(
     session: AsyncSession,
     table_name: str,
-    columns: list[str],
-    limit: int = 5
+    columns: list[dict],
+    sample_size: int = 5,
+    sample_percent: float = 100.0,
+    sampling_method: str = "SYSTEM"
 ) -> dict:
     """
+    Profile every column in a single pass over a TABLESAMPLE of the table.
+
+    ``columns`` is the output of ``get_table_schema``.
+
     Returns:
     {
-      "col1": ["a", "b"],
-      "col2": ["10", "20"]
+      "sample_rows": 1000,
+      "sample_percent": 2.5,
+      "columns": {
+        "col1": {
+          "sample_values": ["a", "b"],
+          "null_fraction": 0.1,
+          "distinct_count": 42,
+          "min": "a",
+          "max": "z"
+        },
+        ...
+      }
     }
     """
-    samples = {}
+    if sampling_method not in {"SYSTEM", "BERNOULLI"}:
+        raise ValueError(f"Unsupported sampling method: {sampling_method}")
 
-    for col in columns:
-        query = text(
-            f'SELECT "{col}" FROM "{table_name}" '
-            f'WHERE "{col}" IS NOT NULL '
-            f'ORDER BY RANDOM() LIMIT :limit'
-        )
+    # One json object per column keeps the select list far below Postgres'
+    # 1664 target-entry limit even on very wide tables
+    select_list = ["count(*) AS sample_rows"]
 
-        result = await session.execute(
-            query,
-            {"limit": limit}
+    for i, column in enumerate(columns):
+        col = _quote(column["column_name"])
+        orderable = column["data_type"] not in UNORDERED_TYPES
+
+        select_list.append(
+            "json_build_object("
+            f"'nulls', count(*) FILTER (WHERE {col} IS NULL), "
+            f"'distinct', count(DISTINCT {col}), "
+            f"'min', {f'min({col})::text' if orderable else 'NULL'}, "
+            f"'max', {f'max({col})::text' if orderable else 'NULL'}, "
+            f"'samples', (array_agg(DISTINCT {col}::text) FILTER (WHERE {col} IS NOT NULL))[1:{int(sample_size)}]"
+            f") AS c{i}"
         )
 
-        samples[col] = [row[0] for row in result.fetchall()]
+    tablesample = (
+        f" TABLESAMPLE {sampling_method} ({sample_percent:.6f})"
+        if sample_percent < 100
+        else ""
+    )
+
+    result = await session.execute(
+        text(f"SELECT {', '.join(select_list)} FROM {_quote(table_name)}{tablesample}")
+    )
+    row = result.fetchone()
+
+    sample_rows = row[0]
+    fraction = sample_percent / 100
 
-    return samples
+    profile = {}
+    for i, column in enumerate(columns):
+        stats = row[i + 1]
+        if isinstance(stats, str):
+            stats = json.loads(stats)
+        non_null = sample_rows - stats["nulls"]
+        distinct_count = stats["distinct"]
 
+        # A column that is (nearly) unique in the sample is assumed to stay unique
+        # in the full table; anything repetitive is assumed to have been fully seen
+        if fraction < 1 and non_null and distinct_count >= 0.9 * non_null:
+            distinct_count = int(distinct_count / fraction)
 
-async def get_random_records(
+        profile[column["column_name"]] = {
+            "sample_values": stats["samples"] or [],
+            "null_fraction": round(stats["nulls"] / sample_rows, 4) if sample_rows else None,
+            "distinct_count": distinct_count,
+            "min": stats["min"],
+            "max": stats["max"],
+        }
+
+    return {
+        "sample_rows": sample_rows,
+        "sample_percent": sample_percent,
+        "columns": profile,
+    }
+
+
+async def get_sampled_records(
     session: AsyncSession,
     table_name: str,
-    limit: int = 5
+    limit: int = 5,
+    sample_percent: float = 100.0,
+    sampling_method: str = "SYSTEM"
 ) -> list[dict]:
-    query = text(
-        f'SELECT * FROM "{table_name}" ORDER BY RANDOM() LIMIT :limit'
+    if sampling_method not in {"SYSTEM", "BERNOULLI"}:
+        raise ValueError(f"Unsupported sampling method: {sampling_method}")
+
+    tablesample = (
+        f" TABLESAMPLE {sampling_method} ({sample_percent:.6f})"
+        if sample_percent < 100
+        else ""
     )
 
     result = await session.execute(
-        query,
+        text(f"SELECT * FROM {_quote(table_name)}{tablesample} LIMIT :limit"),
         {"limit": limit}
     )
 
     rows = result.fetchall()
-    columns = result.keys()
+    columns = list(result.keys())
 
     return [
         dict(zip(columns, row))
@@ -3,79 +3,413 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import pandas as pd
 from bson import ObjectId
-from app.utils.datatype_mapper import infer_column_types
+import asyncio
+from typing import Iterator, AsyncIterator, Callable, Awaitable
+from app.core.config import settings
+from app.core.process_pool import run_cpu_bound
+from app.utils.column_profiler import ColumnProfiler, profile_chunk
+from app.utils.datatype_mapper import (
+    BOOLEAN_VALUES,
+    fits_numeric_type,
+    infer_columns,
+    numeric_scale,
+    parse_datetime_column,
+    widen_for_stream,
+    widened_numeric_type,
+)
 
 
-async def store_dataframe(
-    session: AsyncSession,
-    df: pd.DataFrame
-) -> tuple[ObjectId, str]:
-    object_id = ObjectId()
-    table_name = f"tbl_{object_id}"  # Prefix with 'tbl_' for clarity
+def to_bigint(series: pd.Series) -> pd.Series:
+    """
+    Int64 when every value is a whole number within BIGINT range, otherwise the
+    float values unchanged so the column can be widened instead of failing.
+    """
+    numeric_col = pd.to_numeric(series, errors='coerce')
+    if fits_numeric_type(numeric_col.dropna(), "BIGINT"):
+        return numeric_col.astype('Int64')
+    return numeric_col
 
-    # --- 1. Infer column types
-    column_types = infer_column_types(df)
 
-    # --- 2. Create table with proper types
-    columns_ddl = ", ".join(
-        f'"{col}" {column_types[col]}' for col in df.columns
-    )
+def to_numeric_scale(series: pd.Series, pg_type: str) -> pd.Series:
+    """Floats rounded to the scale of ``pg_type``; unrounded when they do not fit it."""
+    numeric_col = pd.to_numeric(series, errors='coerce')
+    if fits_numeric_type(numeric_col.dropna(), pg_type):
+        return numeric_col.round(numeric_scale(pg_type))
+    return numeric_col
 
-    create_table_query = f'CREATE TABLE "{table_name}" ({columns_ddl});'
-    
-    await session.execute(text(create_table_query))
 
-    # --- 3. Convert DataFrame columns to appropriate types
+def to_boolean(series: pd.Series) -> pd.Series:
+    """Nullable booleans from bool values or their text spellings ("True", "false")."""
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series.astype('boolean')
+    text_col = series.astype(str).str.strip().str.lower().where(series.notna())
+    return text_col.map(BOOLEAN_VALUES).astype('boolean')
+
+
+def datetime_formats_of(column_info: dict[str, dict]) -> dict[str, str]:
+    """The datetime formats ``infer_columns`` stored, by column."""
+    return {
+        col: info["datetime_format"]
+        for col, info in column_info.items()
+        if "datetime_format" in info
+    }
+
+
+def convert_dataframe(
+    df: pd.DataFrame,
+    column_types: dict[str, str],
+    datetime_formats: dict[str, str] | None = None
+) -> pd.DataFrame:
+    """
+    Cast every column of ``df`` to the pandas dtype matching its PostgreSQL type.
+
+    ``datetime_formats`` holds the formats ``infer_columns`` chose for date columns.
+    """
     df_converted = df.copy()
-    
+    datetime_formats = datetime_formats or {}
+
     for col in df.columns:
         pg_type = column_types[col]
-        
+
         if pg_type == "BIGINT":
-            df_converted[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
-        
+            df_converted[col] = to_bigint(df[col])
+
         elif pg_type == "DOUBLE PRECISION":
             df_converted[col] = pd.to_numeric(df[col], errors='coerce')
-        
+
         elif pg_type == "BOOLEAN":
-            df_converted[col] = df[col].astype('boolean')
-        
+            df_converted[col] = to_boolean(df[col])
+
+        elif numeric_scale(pg_type) is not None:
+            # Floats; PostgreSQL stores them at the column's exact scale
+            df_converted[col] = to_numeric_scale(df[col], pg_type)
+
         elif pg_type == "TIMESTAMP":
-            df_converted[col] = pd.to_datetime(df[col], errors='coerce')
-        
+            df_converted[col] = parse_datetime_column(df[col], datetime_formats.get(col))
+
+        elif pg_type == "DATE":
+            df_converted[col] = parse_datetime_column(
+                df[col], datetime_formats.get(col)
+            ).dt.normalize()
+
         elif pg_type == "TEXT":
             # Keep as is, but handle NaN
             df_converted[col] = df[col].astype(str).replace('nan', None)
 
-    # --- 4. Prepare INSERT with proper type handling
-    column_names = ", ".join(f'"{col}"' for col in df_converted.columns)
-    placeholders = ", ".join(f":col_{i}" for i in range(len(df_converted.columns)))
+    return df_converted
+
+
+def convert_and_profile(
+    df: pd.DataFrame,
+    column_types: dict[str, str],
+    datetime_formats: dict[str, str] | None = None
+) -> tuple[pd.DataFrame, dict]:
+    """Convert ``df`` and summarize it for ``ColumnProfiler`` in the same worker call."""
+    df_converted = convert_dataframe(df, column_types, datetime_formats)
+    return df_converted, profile_chunk(df_converted, column_types)
+
+
+def iter_record_chunks(
+    df: pd.DataFrame,
+    chunk_size: int
+) -> Iterator[list[tuple]]:
+    """
+    Yield the rows of ``df`` as lists of plain Python tuples, ``chunk_size`` rows at a time.
+
+    NA/NaN/NaT become None and timestamps become ``datetime`` so the values can be
+    handed directly to the database driver.
+    """
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        columns = []
+
+        for col in chunk.columns:
+            series = chunk[col]
+            missing = series.isna().tolist()
+
+            if pd.api.types.is_datetime64_any_dtype(series.dtype):
+                values = list(series.dt.to_pydatetime())
+            else:
+                values = series.astype(object).tolist()
+
+            columns.append([
+                None if is_missing else value
+                for value, is_missing in zip(values, missing)
+            ])
+
+        yield list(zip(*columns))
+
+
+async def _record_chunks(
+    df: pd.DataFrame,
+    chunk_size: int
+) -> AsyncIterator[list[tuple]]:
+    """
+    ``iter_record_chunks`` with every chunk built in a thread: turning a large
+    chunk into tuples takes long enough to stall other requests on the event loop.
+    """
+    records = iter_record_chunks(df, chunk_size)
+    while (chunk := await asyncio.to_thread(next, records, None)) is not None:
+        yield chunk
+
+
+async def _copy_dataframe(
+    session: AsyncSession,
+    table_name: str,
+    df: pd.DataFrame,
+    chunk_size: int
+) -> bool:
+    """
+    Bulk load ``df`` with asyncpg's binary COPY protocol.
+
+    Returns False when the underlying driver does not support COPY so the caller
+    can fall back to INSERT.
+    """
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    if not hasattr(driver_connection, "copy_records_to_table"):
+        return False
+
+    columns = list(df.columns)
+    async for records in _record_chunks(df, chunk_size):
+        await driver_connection.copy_records_to_table(
+            table_name,
+            records=records,
+            columns=columns,
+        )
+
+    return True
+
+
+async def _insert_dataframe(
+    session: AsyncSession,
+    table_name: str,
+    df: pd.DataFrame,
+    chunk_size: int
+) -> None:
+    column_names = ", ".join(f'"{col}"' for col in df.columns)
+    placeholders = ", ".join(f":col_{i}" for i in range(len(df.columns)))
 
     insert_query = text(
         f'INSERT INTO "{table_name}" ({column_names}) VALUES ({placeholders})'
     )
 
-    # --- 5. Prepare values with proper type handling
-    values = []
-    for _, row in df_converted.iterrows():
-        row_dict = {}
-        for i, col in enumerate(df_converted.columns):
-            value = row[col]
-            
-            # Handle pandas NA/NaN/NaT
-            if pd.isna(value):
-                row_dict[f"col_{i}"] = None
-            elif isinstance(value, pd.Timestamp):
-                row_dict[f"col_{i}"] = value.to_pydatetime()
-            else:
-                row_dict[f"col_{i}"] = value
-        
-        values.append(row_dict)
-
-    # --- 6. Execute bulk insert
-    if values:  # Only insert if we have data
+    async for records in _record_chunks(df, chunk_size):
+        values = [
+            {f"col_{i}": value for i, value in enumerate(record)}
+            for record in records
+        ]
         await session.execute(insert_query, values)
-    
+
+
+async def create_table(
+    session: AsyncSession,
+    column_types: dict[str, str],
+    object_id: ObjectId | None = None,
+) -> tuple[ObjectId, str]:
+    object_id = object_id or ObjectId()
+    table_name = f"tbl_{object_id}"  # Prefix with 'tbl_' for clarity
+
+    columns_ddl = ", ".join(
+        f'"{col}" {pg_type}' for col, pg_type in column_types.items()
+    )
+
+    create_table_query = f'CREATE TABLE "{table_name}" ({columns_ddl});'
+
+    await session.execute(text(create_table_query))
+
+    return object_id, table_name
+
+
+async def widen_columns(
+    session: AsyncSession,
+    table_name: str,
+    df_converted: pd.DataFrame,
+    column_types: dict[str, str],
+    profiler: ColumnProfiler | None = None,
+) -> dict[str, str]:
+    """
+    ALTER BIGINT/NUMERIC columns whose converted values in ``df_converted`` do not
+    fit them, i.e. a chunk after the ones types were inferred from. Updates
+    ``column_types`` and the profiler in place and returns the widened columns.
+    """
+    widened = {
+        col: widened_numeric_type(df_converted[col])
+        for col, pg_type in column_types.items()
+        if (pg_type == "BIGINT" or numeric_scale(pg_type) is not None)
+        and not fits_numeric_type(df_converted[col].dropna(), pg_type)
+    }
+
+    for col, pg_type in widened.items():
+        await session.execute(text(
+            f'ALTER TABLE "{table_name}" ALTER COLUMN "{col}" TYPE {pg_type}'
+        ))
+        column_types[col] = pg_type
+        if profiler is not None:
+            profiler.column_info[col] = {"pg_type": pg_type, "inferred_type": "float"}
+        print(f"[append_dataframe] {table_name}: widened {col!r} to {pg_type}")
+
+    return widened
+
+
+async def append_dataframe(
+    session: AsyncSession,
+    table_name: str,
+    df: pd.DataFrame,
+    column_types: dict[str, str],
+    use_copy: bool = True,
+    chunk_size: int | None = None,
+    profiler: ColumnProfiler | None = None,
+    datetime_formats: dict[str, str] | None = None,
+) -> bool:
+    """
+    Convert ``df`` to the table's column types and append it to ``table_name``.
+
+    Rows are streamed with COPY, falling back to chunked INSERT. Returns whether
+    COPY was used so callers appending many frames can skip retrying it.
+    When a ``profiler`` is given the converted rows are also added to it.
+    Numeric columns whose values do not fit their type are widened first.
+    Pass the ``datetime_formats`` chosen at inference so every frame of a
+    table parses its dates the same way.
+    """
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+
+    if profiler is not None:
+        df_converted, partial = await run_cpu_bound(
+            convert_and_profile, df, column_types, datetime_formats
+        )
+        profiler.add(partial)
+    else:
+        df_converted = await run_cpu_bound(
+            convert_dataframe, df, column_types, datetime_formats
+        )
+
+    await widen_columns(session, table_name, df_converted, column_types, profiler)
+
+    copied = False
+    if use_copy and not df_converted.empty:
+        try:
+            async with session.begin_nested():
+                copied = await _copy_dataframe(
+                    session, table_name, df_converted, chunk_size
+                )
+        except Exception as e:
+            print(f"[append_dataframe] COPY failed, falling back to INSERT: {e}")
+            copied = False
+
+    if not copied:
+        await _insert_dataframe(session, table_name, df_converted, chunk_size)
+
+    return copied
+
+
+async def store_dataframe(
+    session: AsyncSession,
+    df: pd.DataFrame,
+    use_copy: bool = True,
+    chunk_size: int | None = None,
+    object_id: ObjectId | None = None,
+    profiler: ColumnProfiler | None = None,
+) -> tuple[ObjectId, str]:
+    # --- 1. Infer column types
+    column_info = await run_cpu_bound(infer_columns, df)
+    column_types = {col: info["pg_type"] for col, info in column_info.items()}
+    datetime_formats = datetime_formats_of(column_info)
+    if profiler is not None:
+        profiler.start(column_info)
+
+    # --- 2. Create table with proper types
+    object_id, table_name = await create_table(session, column_types, object_id)
+
+    # --- 3. Convert and load rows
+    await append_dataframe(
+        session, table_name, df, column_types, use_copy, chunk_size, profiler,
+        datetime_formats,
+    )
+
+    await session.commit()
+
+    return object_id, table_name
+
+
+async def store_dataframe_chunks(
+    session: AsyncSession,
+    chunks: Iterator[pd.DataFrame],
+    infer_chunks: int | None = None,
+    use_copy: bool = True,
+    on_chunk: Callable[[dict], Awaitable[None]] | None = None,
+    object_id: ObjectId | None = None,
+    profiler: ColumnProfiler | None = None,
+) -> tuple[ObjectId, str]:
+    """
+    Load a stream of DataFrame chunks into a new table.
+
+    Column types are inferred from the first ``infer_chunks`` chunks (BIGINT and
+    NUMERIC columns are widened when later chunks do not fit), the table is
+    created once and every chunk is appended as it arrives, so peak memory depends
+    on the chunk size rather than the file size. A ``profiler`` sees every chunk
+    on its way to the table.
+    """
+    infer_chunks = infer_chunks or settings.INGEST_INFER_CHUNKS
+
+    async def next_chunk() -> pd.DataFrame | None:
+        # Parsing the next chunk is blocking pandas work, keep it off the loop
+        return await asyncio.to_thread(next, chunks, None)
+
+    # --- 1. Infer column types from the leading chunks
+    buffered = []
+    while len(buffered) < infer_chunks:
+        chunk = await next_chunk()
+        if chunk is None:
+            break
+        buffered.append(chunk)
+
+    column_info = await run_cpu_bound(
+        infer_columns, pd.concat(buffered, ignore_index=True)
+    )
+    if len(buffered) == infer_chunks:
+        # More chunks may follow: leave NUMERIC precision room for larger values
+        for info in column_info.values():
+            info["pg_type"] = widen_for_stream(info["pg_type"])
+
+    column_types = {col: info["pg_type"] for col, info in column_info.items()}
+    datetime_formats = datetime_formats_of(column_info)
+    if profiler is not None:
+        profiler.start(column_info)
+
+    # --- 2. Create table with proper types
+    object_id, table_name = await create_table(session, column_types, object_id)
+
+    # --- 3. Append buffered chunks, then the rest of the stream
+    async def pending_chunks() -> AsyncIterator[pd.DataFrame]:
+        # Release each buffered chunk as soon as it has been handed out
+        while buffered:
+            yield buffered.pop(0)
+        while (chunk := await next_chunk()) is not None:
+            yield chunk
+
+    rows_loaded = 0
+    chunk_index = 0
+    async for chunk in pending_chunks():
+        chunk_index += 1
+        use_copy = await append_dataframe(
+            session, table_name, chunk, column_types, use_copy, len(chunk), profiler,
+            datetime_formats,
+        )
+        rows_loaded += len(chunk)
+
+        print(f"[store_dataframe_chunks] {table_name}: chunk {chunk_index}, {rows_loaded} rows loaded")
+
+        if on_chunk:
+            await on_chunk({
+                "table_name": table_name,
+                "chunk": chunk_index,
+                "rows": len(chunk),
+                "rows_loaded": rows_loaded,
+            })
+
     await session.commit()
 
-    return object_id, table_name
\ No newline at end of file
+    return object_id, table_name
@@ -11,6 +11,9 @@ from app.db.mongo import connect_mongo, close_mongo, get_mongo_db
 from app.models.user import User
 from app.models.mapping_mng import DBMapping
 from app.models.chat import Message, Thread
+from app.models.column_description import ColumnDescription
+from app.models.sql_cache import SQLCacheEntry
+from app.models.conversation_summary import ConversationSummary
 from app.api.user import router as user_router
 from app.api.auth import router as auth_router
 from app.api.ingestion import router as ingest_router
@@ -18,6 +21,8 @@ from app.api.chat import router as chat_router
 from app.core.config import settings
 from app.services.ws_service import manager
 from app.services.redis_service import redis_event_listener
+from app.services.ingestion_queue_service import ingestion_worker, recover_stale_ingestions
+from app.core.process_pool import start_process_pool, shutdown_process_pool
 from motor.motor_asyncio import AsyncIOMotorClient
 
 class MongoDB:
@@ -37,21 +42,39 @@ async def lifespan(app: FastAPI):
     db = get_mongo_db()
     await init_beanie(
         database=db,
-        document_models=[User, DBMapping, Message, Thread]
+        document_models=[User, DBMapping, Message, Thread, ColumnDescription, SQLCacheEntry, ConversationSummary]
     )
     # Redis listner start listning here
     redis_task = asyncio.create_task(redis_event_listener())
     print("🚀 Redis Listener running")
 
+    # Process pool for CPU-bound pandas work (parsing, type inference, conversion)
+    start_process_pool()
+    print(f"🚀 Process pool running with {settings.PROCESS_POOL_WORKERS} workers")
+
+    # Ingestion workers consume upload jobs queued by /ingest/file
+    await recover_stale_ingestions()
+    ingestion_tasks = [
+        asyncio.create_task(ingestion_worker(worker_id))
+        for worker_id in range(settings.INGEST_MAX_CONCURRENCY)
+    ]
+    print(f"🚀 {len(ingestion_tasks)} ingestion workers running")
+
     yield
 
     # App Shutdown
+    print("🔻 Shutting down ingestion workers")
+    for task in ingestion_tasks:
+        task.cancel()
+    await asyncio.gather(*ingestion_tasks, return_exceptions=True)
+
     print("🔻 Shutting down Redis listener")
     redis_task.cancel()
     try:
         await redis_task
     except asyncio.CancelledError:
         print("🛑 Redis listener cancelled")
+    shutdown_process_pool()
     await close_mongo()
     print("🛑 App shutdown completed")
 
@@ -0,0 +1,32 @@
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+from app.core.config import settings
+
+
+class ColumnDescription(Document):
+    fingerprint: str
+    user_id: str
+    column_name: str
+    dtype: str
+
+    inferred_type: str = "string"
+    description: str = ""
+    source: str = "LLM"  # LLM | USER_REFINED
+    hits: int = 0
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "column_descriptions"
+        indexes = [
+            IndexModel([("fingerprint", ASCENDING)], unique=True),
+            # Entries nobody has reused for SCHEMA_CACHE_TTL_DAYS are dropped
+            IndexModel(
+                [("last_used_at", ASCENDING)],
+                expireAfterSeconds=settings.SCHEMA_CACHE_TTL_DAYS * 24 * 3600,
+            ),
+        ]
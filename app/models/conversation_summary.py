@@ -0,0 +1,18 @@
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class ConversationSummary(Document):
+    session_id: str
+    summary: str = ""
+    # Number of leading messages of the session already folded into the summary
+    summarized_count: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "conversation_summary"
+        indexes = [
+            IndexModel([("session_id", ASCENDING)], unique=True),
+        ]
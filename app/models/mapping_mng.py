@@ -12,7 +12,11 @@ class DBMapping(Document):
     
     schema: Optional[List[Dict[str, Any]]] = None
     random_records: Optional[List[Dict[str, Any]]] = None
+    column_profile: Optional[Dict[str, Any]] = None
+    indexes: Optional[List[Dict[str, Any]]] = None
     schema_status: Optional[str] = "PENDING"
+    error: Optional[str] = None
+    attempts: int = 0
     created_at: Optional[datetime] = None
     
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import List
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+from app.core.config import settings
+
+
+class SQLCacheEntry(Document):
+    user_id: str
+    tables_fingerprint: str
+    context_key: str = ""
+    table_names: List[str]
+
+    question: str
+    normalized_question: str
+    question_tokens: List[str]
+
+    sql: str
+    explanation: str = ""
+    queries: List[str]
+
+    hits: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "sql_cache"
+        indexes = [
+            IndexModel([
+                ("user_id", ASCENDING),
+                ("tables_fingerprint", ASCENDING),
+                ("context_key", ASCENDING),
+                ("normalized_question", ASCENDING),
+            ]),
+            IndexModel([("user_id", ASCENDING), ("table_names", ASCENDING)]),
+            IndexModel(
+                [("last_used_at", ASCENDING)],
+                expireAfterSeconds=settings.SQL_CACHE_TTL_DAYS * 24 * 3600,
+            ),
+        ]
@@ -27,4 +27,27 @@ class MessageResponse(BaseModel):
         from_attributes: True
 
 class MessageCreate(BaseModel):
-    content: str
\ No newline at end of file
+    content: str
+
+
+class SQLCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class PoolStats(BaseModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    saturation: float
+    checkouts: int
+    checkout_timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class PoolStatsResponse(BaseModel):
+    primary: PoolStats
+    read: PoolStats
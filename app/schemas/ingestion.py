@@ -7,8 +7,18 @@ class IngestionResponse(BaseModel):
     object_id: str
     table_name: str
     file_name: str
+    status: str
     created_at: datetime
 
+class IngestionStatusResponse(BaseModel):
+    mapping_id: str
+    object_id: str
+    table_name: str
+    file_name: str
+    schema_status: str
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
 class ColumnSchema(BaseModel):
     column_name: str
     inferred_type: str
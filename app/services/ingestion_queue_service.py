@@ -0,0 +1,328 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi import UploadFile
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.mongo import get_mongo_db
+from app.db.postgres import AsyncSessionLocal
+from app.db.postgres_index_utils import optimize_table
+from app.models.mapping_mng import DBMapping
+from app.models.user import User
+from app.services.ingestion_service import load_file
+from app.services.redis_service import publish_event
+from app.services.schema_maker_service import generate_and_store_schema
+
+# Bytes read from the request per GridFS write
+UPLOAD_READ_SIZE = 1024 * 1024
+
+# Mappings that no longer need a worker
+FINISHED_STATUSES = {"COMPLETED", "USER_REFINED", "FAILED"}
+
+# Unique per process: several uvicorn processes can share a host (and a pid
+# can be reused after a restart)
+PROCESS_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def publish_ingestion_event(mapping_id: str, status: str, content: str, **extra):
+    # Progress goes out on the regular event channel, keyed by the mapping id, so
+    # clients can follow a job over /ws/messages/{mapping_id}
+    await publish_event(
+        thread_id=mapping_id,
+        bot_message_id=mapping_id,
+        event={
+            "type": "status",
+            "stage": "ingestion",
+            "status": status,
+            "content": content,
+            **extra,
+        },
+    )
+
+
+def _uploads_bucket() -> AsyncIOMotorGridFSBucket:
+    return AsyncIOMotorGridFSBucket(get_mongo_db(), bucket_name=settings.INGEST_UPLOAD_BUCKET)
+
+
+def _processing_queue(owner: str) -> str:
+    """List holding the job a worker is running until it is acknowledged."""
+    return f"{settings.INGEST_QUEUE}:processing:{owner}"
+
+
+def _heartbeat_key(owner: str) -> str:
+    """Expires once the worker owning the processing list stops running."""
+    return f"{settings.INGEST_QUEUE}:heartbeat:{owner}"
+
+
+async def _keep_alive(redis, heartbeat_key: str):
+    while True:
+        await asyncio.sleep(settings.INGEST_HEARTBEAT_SECONDS)
+        try:
+            await redis.set(heartbeat_key, PROCESS_ID, ex=settings.INGEST_HEARTBEAT_TTL_SECONDS)
+        except Exception as e:
+            # Retried next beat; the TTL spans several beats
+            print(f"[Ingestion Worker] Could not refresh {heartbeat_key}: {e}")
+
+
+async def requeue_orphaned_jobs(redis) -> int:
+    """
+    Move jobs back to the queue from processing lists whose worker's heartbeat
+    has expired, i.e. the process was shut down or crashed mid-job.
+    """
+    prefix = f"{settings.INGEST_QUEUE}:processing:"
+    requeued = 0
+
+    async for key in redis.scan_iter(match=f"{prefix}*"):
+        key = key.decode() if isinstance(key, bytes) else key
+        if await redis.exists(_heartbeat_key(key[len(prefix):])):
+            continue
+        while await redis.lmove(key, settings.INGEST_QUEUE, "RIGHT", "LEFT"):
+            requeued += 1
+
+    return requeued
+
+
+async def _save_upload(input_file: UploadFile, object_id: ObjectId):
+    """
+    Store the upload in GridFS under ``object_id`` so a worker on any instance
+    can pick it up after the request has ended.
+    """
+    grid_in = _uploads_bucket().open_upload_stream_with_id(object_id, input_file.filename)
+
+    try:
+        await input_file.seek(0)
+        while data := await input_file.read(UPLOAD_READ_SIZE):
+            await grid_in.write(data)
+    except Exception:
+        await grid_in.abort()
+        raise
+
+    await grid_in.close()
+
+
+async def _download_upload(mapping: DBMapping) -> str:
+    """Copy a stored upload to a local temp file for parsing."""
+    extension = mapping.file_name.split(".")[-1].lower()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{extension}") as tmp:
+        path = tmp.name
+
+    try:
+        with open(path, "wb") as f:
+            await _uploads_bucket().download_to_stream(ObjectId(mapping.db_id), f)
+    except Exception:
+        os.unlink(path)
+        raise
+
+    return path
+
+
+async def _delete_upload(mapping: DBMapping):
+    try:
+        await _uploads_bucket().delete(ObjectId(mapping.db_id))
+    except NoFile:
+        pass
+    except Exception as e:
+        print(f"[Ingestion Worker] Could not delete upload {mapping.db_id}: {e}")
+
+
+async def _discard_job(mapping: DBMapping):
+    """Drop the job's table and stored upload; safe to call twice."""
+    try:
+        async with AsyncSessionLocal() as pg_session:
+            await pg_session.execute(text(f'DROP TABLE IF EXISTS "{mapping.table_name}"'))
+            await pg_session.commit()
+    except Exception as e:
+        print(f"[Ingestion Worker] Could not drop {mapping.table_name}: {e}")
+
+    await _delete_upload(mapping)
+
+
+async def enqueue_ingestion(input_file: UploadFile, user: User) -> DBMapping:
+    """
+    Register a PENDING mapping for the upload and queue it for a worker.
+    """
+    object_id = ObjectId()
+    await _save_upload(input_file, object_id)
+
+    mapping = DBMapping(
+        user_id=str(user.id),
+        db_id=str(object_id),
+        table_name=f"tbl_{object_id}",
+        file_name=input_file.filename,
+        schema_status="PENDING",
+    )
+    await mapping.insert()
+
+    redis = await get_redis()
+    await redis.rpush(
+        settings.INGEST_QUEUE,
+        json.dumps({"mapping_id": str(mapping.id)}),
+    )
+
+    return mapping
+
+
+async def _set_status(mapping: DBMapping, status: str, error: str | None = None):
+    mapping.schema_status = status
+    mapping.error = error
+    mapping.updated_at = datetime.utcnow()
+    await mapping.save()
+
+
+async def _fail_job(mapping: DBMapping, error: str):
+    print(f"[Ingestion Worker] Job {mapping.id} failed: {error}")
+    await _discard_job(mapping)
+    await _set_status(mapping, "FAILED", error=error)
+    await publish_ingestion_event(str(mapping.id), "FAILED", error)
+
+
+async def process_ingestion_job(job: dict):
+    mapping = await DBMapping.get(job["mapping_id"])
+    if not mapping:
+        print(f"[Ingestion Worker] Mapping {job['mapping_id']} no longer exists")
+        return
+    if mapping.schema_status in FINISHED_STATUSES:
+        print(f"[Ingestion Worker] Job {mapping.id} is already {mapping.schema_status}")
+        return
+
+    mapping_id = str(mapping.id)
+
+    mapping.attempts += 1
+    if mapping.attempts > settings.INGEST_MAX_ATTEMPTS:
+        await _fail_job(mapping, f"Ingestion was interrupted {settings.INGEST_MAX_ATTEMPTS} times")
+        return
+
+    path = None
+    try:
+        await _set_status(mapping, "PROCESSING")
+        await publish_ingestion_event(mapping_id, "PROCESSING", "Loading file…")
+
+        async def report_chunk(progress: dict):
+            # Doubles as a heartbeat for recover_stale_ingestions
+            await _set_status(mapping, "PROCESSING")
+            await publish_ingestion_event(
+                mapping_id,
+                "PROCESSING",
+                f"Loaded {progress['rows_loaded']} rows…",
+                rows_loaded=progress["rows_loaded"],
+            )
+
+        path = await _download_upload(mapping)
+
+        with open(path, "rb") as f:
+            input_file = UploadFile(file=f, filename=mapping.file_name)
+
+            async with AsyncSessionLocal() as pg_session:
+                # A previous, interrupted attempt may have committed the table
+                await pg_session.execute(text(f'DROP TABLE IF EXISTS "{mapping.table_name}"'))
+
+                _, _, column_profile = await load_file(
+                    input_file,
+                    pg_session,
+                    object_id=ObjectId(mapping.db_id),
+                    on_progress=report_chunk,
+                )
+
+                await _set_status(mapping, "PROCESSING")
+                await publish_ingestion_event(mapping_id, "PROCESSING", "Optimizing table…")
+                mapping.indexes = await optimize_table(
+                    pg_session, mapping.table_name, column_profile
+                )
+
+        await _set_status(mapping, "PROCESSING")
+        await publish_ingestion_event(mapping_id, "PROCESSING", "Generating schema…")
+
+        # The profile was collected while loading, so the table is not read back
+        await generate_and_store_schema(
+            mapping=mapping,
+            column_profile=column_profile
+        )
+
+    except Exception as e:
+        error = getattr(e, "detail", None) or str(e)
+        await _fail_job(mapping, str(error))
+
+    else:
+        await _delete_upload(mapping)
+        await publish_ingestion_event(mapping_id, "COMPLETED", "File ingested successfully")
+
+    finally:
+        if path and os.path.exists(path):
+            os.unlink(path)
+
+
+async def recover_stale_ingestions():
+    """
+    Fail jobs that stopped reporting progress, e.g. because the instance running
+    them went away for good. Run once at startup, before the workers start.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.INGEST_STALE_AFTER_SECONDS)
+    stale = await DBMapping.find(
+        DBMapping.schema_status == "PROCESSING",
+        DBMapping.updated_at < cutoff,
+    ).to_list()
+
+    for mapping in stale:
+        await _fail_job(mapping, "Ingestion was interrupted")
+
+    if stale:
+        print(f"[Ingestion Worker] Marked {len(stale)} stale job(s) as FAILED")
+
+
+async def ingestion_worker(worker_id: int):
+    redis = await get_redis()
+    owner = f"{PROCESS_ID}:{worker_id}"
+    processing_queue = _processing_queue(owner)
+    heartbeat_key = _heartbeat_key(owner)
+
+    await redis.set(heartbeat_key, PROCESS_ID, ex=settings.INGEST_HEARTBEAT_TTL_SECONDS)
+    heartbeat = asyncio.create_task(_keep_alive(redis, heartbeat_key))
+    print(f"🎧 Ingestion worker {worker_id} started")
+
+    last_orphan_check = 0.0
+    try:
+        while True:
+            try:
+                # Jobs of workers that went away, checked about once per heartbeat TTL
+                if time.monotonic() - last_orphan_check > settings.INGEST_HEARTBEAT_TTL_SECONDS:
+                    last_orphan_check = time.monotonic()
+                    requeued = await requeue_orphaned_jobs(redis)
+                    if requeued:
+                        print(f"[Ingestion Worker {worker_id}] Requeued {requeued} interrupted job(s)")
+
+                raw_job = await redis.blmove(
+                    settings.INGEST_QUEUE, processing_queue, timeout=5, src="LEFT", dest="RIGHT"
+                )
+                if not raw_job:
+                    continue
+
+                await process_ingestion_job(json.loads(raw_job))
+
+                # Only acknowledged once the job finished, failed included
+                await redis.lrem(processing_queue, 1, raw_job)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Ingestion Worker {worker_id}] Error: {e}")
+                await asyncio.sleep(2)
+
+    finally:
+        heartbeat.cancel()
+        # An interrupted job stays in our list; once the heartbeat is gone any
+        # instance requeues it
+        try:
+            await redis.delete(heartbeat_key)
+        except Exception as e:
+            print(f"[Ingestion Worker {worker_id}] Could not clear heartbeat: {e}")
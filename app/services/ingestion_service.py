@@ -1,25 +1,51 @@
-from app.models.mapping_mng import DBMapping
-from app.utils.file_parser import parse_file
-from app.db.postgres_utils import store_dataframe
-from app.models.user import User
+from typing import Callable, Awaitable
+from bson import ObjectId
+from app.utils.file_parser import (
+    parse_file,
+    get_extension,
+    iter_csv_chunks,
+    STREAMABLE_EXTENSIONS,
+)
+from app.db.postgres_utils import store_dataframe, store_dataframe_chunks
+from app.utils.column_profiler import ColumnProfiler
+from app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import UploadFile
 
-async def ingest_files(
+
+async def load_file(
     input_file: UploadFile,
-    user: User,
     pg_session: AsyncSession,
-):
-    
-    df = await parse_file(input_file)
-
-    object_id, tbl_name = await store_dataframe(pg_session, df)
-
-    mapping = DBMapping(
-        user_id=str(user.id),
-        db_id=str(object_id),
-        table_name=tbl_name,
-        file_name=input_file.filename
-    )
-    await mapping.insert()
-    return mapping
\ No newline at end of file
+    object_id: ObjectId | None = None,
+    on_progress: Callable[[dict], Awaitable[None]] | None = None,
+) -> tuple[ObjectId, str, dict]:
+    """
+    Parse an uploaded file and load it into a new ``tbl_<object_id>`` table.
+
+    Also returns the column profile gathered while the rows were written.
+    """
+    extension = get_extension(input_file)
+    profiler = ColumnProfiler()
+
+    if settings.INGEST_STREAMING and extension in STREAMABLE_EXTENSIONS:
+        # Stream the upload chunk by chunk instead of materializing the whole file
+        async def report_chunk(progress: dict):
+            if on_progress:
+                await on_progress({"file_name": input_file.filename, **progress})
+
+        object_id, table_name = await store_dataframe_chunks(
+            pg_session,
+            iter_csv_chunks(input_file, settings.INGEST_CHUNK_SIZE),
+            on_chunk=report_chunk,
+            object_id=object_id,
+            profiler=profiler,
+        )
+    else:
+        df = await parse_file(input_file)
+
+        object_id, table_name = await store_dataframe(
+            pg_session, df, object_id=object_id, profiler=profiler
+        )
+
+    return object_id, table_name, profiler.result()
+
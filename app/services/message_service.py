@@ -1,8 +1,10 @@
 from datetime import datetime
 from typing import List
+import hashlib
 from app.models.chat import Message
 from beanie import PydanticObjectId
 from app.models.mapping_mng import DBMapping
+from app.utils.schema_index import build_schema_index
 
 
 
@@ -34,6 +36,9 @@ async def get_all_table_mappings(user_id: str):
         DBMapping.user_id == user_id,
     ).to_list()
 
+    # Uploads still queued, processing or failed have no schema to query yet
+    mappings = [mapping for mapping in mappings if mapping.schema]
+
     if not mappings:
         raise ValueError(
             f"No completed schemas found for user_id={user_id}"
@@ -42,13 +47,28 @@ async def get_all_table_mappings(user_id: str):
     return [
         {
             "table_name": mapping.table_name,
+            "file_name": mapping.file_name,
             "schema": mapping.schema,
             "random_records": mapping.random_records,
+            # Changes whenever the table is re-ingested or its schema edited
+            "fingerprint": hashlib.sha1(
+                f"{mapping.table_name}:{mapping.updated_at}".encode()
+            ).hexdigest(),
         }
         for mapping in mappings
     ]
 
 
+async def refresh_schema_index(user_id: str):
+    """Rebuild the user's schema index after a mapping was created or updated."""
+    try:
+        tables = await get_all_table_mappings(user_id)
+    except ValueError:
+        return
+
+    build_schema_index(str(user_id), tables)
+
+
 
 async def create_message(content: str, user_id: str, thread_id: str) -> Message:
     """
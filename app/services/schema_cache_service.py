@@ -0,0 +1,126 @@
+# app/services/schema_cache_service.py
+import hashlib
+import json
+import re
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.models.column_description import ColumnDescription
+
+
+def _value_shape(value) -> str:
+    """Reduce a sample value to its shape, e.g. "INV-2024-001" -> "A-9-9"."""
+    shape = re.sub(r"[A-Za-z]+", "A", str(value))
+    return re.sub(r"[0-9]+", "9", shape)
+
+
+def column_fingerprint(user_id: str, column: dict) -> str:
+    """
+    Content address of a column: name, dtype and the shape of its sample values.
+
+    Shapes are used instead of the raw samples so next month's export of the same
+    report (same headers, new values) still hits the cache.
+    """
+    sample_signature = sorted({
+        _value_shape(value)
+        for value in column.get("sample_values") or []
+        if value is not None
+    })
+
+    key = json.dumps(
+        [user_id, column["name"], column["dtype"].lower(), sample_signature],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+async def get_cached_descriptions(
+    user_id: str,
+    columns: list[dict]
+) -> dict[str, ColumnDescription]:
+    """Returns ``{column_name: ColumnDescription}`` for the columns already described."""
+    if not settings.SCHEMA_CACHE_ENABLED or not columns:
+        return {}
+
+    fingerprints = {column_fingerprint(user_id, col): col["name"] for col in columns}
+
+    try:
+        cached = await ColumnDescription.find(
+            {"fingerprint": {"$in": list(fingerprints)}}
+        ).to_list()
+
+        if cached:
+            # Touching last_used_at keeps reused entries away from the TTL index
+            await ColumnDescription.get_motor_collection().update_many(
+                {"fingerprint": {"$in": [entry.fingerprint for entry in cached]}},
+                {"$set": {"last_used_at": datetime.utcnow()}, "$inc": {"hits": 1}},
+            )
+
+    except Exception as e:
+        print(f"[SchemaCache] Lookup failed, describing all columns: {e}")
+        return {}
+
+    return {fingerprints[entry.fingerprint]: entry for entry in cached}
+
+
+async def store_descriptions(
+    user_id: str,
+    columns: list[dict],
+    schema: list[dict],
+    source: str = "LLM"
+):
+    """
+    Cache the descriptions in ``schema`` for the matching payload ``columns``.
+
+    USER_REFINED descriptions overwrite whatever is cached, LLM descriptions never
+    overwrite an existing entry.
+    """
+    if not settings.SCHEMA_CACHE_ENABLED:
+        return
+
+    columns_by_name = {col["name"]: col for col in columns}
+    now = datetime.utcnow()
+    operations = []
+
+    for entry in schema:
+        column = columns_by_name.get(entry["column_name"])
+        if not column or not entry.get("description"):
+            continue
+
+        fields = {
+            "user_id": user_id,
+            "column_name": column["name"],
+            "dtype": column["dtype"].lower(),
+            "inferred_type": entry.get("inferred_type", "string"),
+            "description": entry["description"],
+            "source": source,
+        }
+
+        if source == "USER_REFINED":
+            update = {
+                "$set": {**fields, "last_used_at": now},
+                "$setOnInsert": {"created_at": now, "hits": 0},
+            }
+        else:
+            update = {
+                "$setOnInsert": {**fields, "created_at": now, "hits": 0},
+                "$set": {"last_used_at": now},
+            }
+
+        operations.append(
+            UpdateOne(
+                {"fingerprint": column_fingerprint(user_id, column)},
+                update,
+                upsert=True,
+            )
+        )
+
+    if not operations:
+        return
+
+    try:
+        await ColumnDescription.get_motor_collection().bulk_write(operations, ordered=False)
+    except Exception as e:
+        print(f"[SchemaCache] Failed to store descriptions: {e}")
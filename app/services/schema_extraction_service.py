@@ -1,43 +1,57 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text, inspect
-import json
+from app.db.postgres_schema_utils import (
+    get_table_schema,
+    get_sample_percent,
+    get_table_profile,
+    get_sampled_records,
+)
 
 
 async def extract_schema_payload(
     pg_session: AsyncSession,
     table_name: str,
-    sample_size: int = 5
+    sample_size: int = 5,
+    sampling_method: str = "SYSTEM"
 ) -> dict:
-    
-    result = await pg_session.execute(
-        text(f'SELECT column_name, data_type FROM information_schema.columns WHERE table_name = :tbl'),
-        {"tbl": table_name}
+    """
+    Build the SchemaMakerAgent payload by sampling the table. Used for mappings
+    without a column profile; new uploads use ``build_schema_payload``.
+    """
+    columns_info = await get_table_schema(pg_session, table_name)
+
+    # Profile all columns in one pass over a TABLESAMPLE instead of one
+    # DISTINCT query per column plus an ORDER BY RANDOM() full sort
+    sample_percent = await get_sample_percent(pg_session, table_name)
+
+    profile = await get_table_profile(
+        pg_session,
+        table_name,
+        columns_info,
+        sample_size=sample_size,
+        sample_percent=sample_percent,
+        sampling_method=sampling_method,
     )
-    columns_info = result.fetchall()
 
     columns = []
-    for col_name, col_type in columns_info:
-        sample_result = await pg_session.execute(
-            text(f'SELECT DISTINCT "{col_name}" FROM "{table_name}" WHERE "{col_name}" IS NOT NULL LIMIT 5')
-        )
-        sample_values = [str(row[0]) for row in sample_result.fetchall()]
+    for col in columns_info:
+        stats = profile["columns"][col["column_name"]]
 
         columns.append({
-            "name": col_name,
-            "dtype": col_type,
-            "sample_values": sample_values
+            "name": col["column_name"],
+            "dtype": col["data_type"],
+            **stats,
         })
 
-    random_result = await pg_session.execute(
-        text(f'SELECT * FROM "{table_name}" ORDER BY RANDOM() LIMIT :limit'),
-        {"limit": sample_size}
+    rows = await get_sampled_records(
+        pg_session,
+        table_name,
+        limit=sample_size,
+        sample_percent=sample_percent,
+        sampling_method=sampling_method,
     )
-    
-    rows = random_result.fetchall()
-    column_names = [col_name for col_name, _ in columns_info]
-    
+
     random_records = [
-        {column_names[i]: (None if val is None else str(val)) for i, val in enumerate(row)}
+        {name: (None if val is None else str(val)) for name, val in row.items()}
         for row in rows
     ]
 
@@ -45,4 +59,30 @@ async def extract_schema_payload(
         "table_name": table_name,
         "columns": columns,
         "random_records": random_records
-    }
\ No newline at end of file
+    }
+
+
+def build_schema_payload(table_name: str, column_profile: dict) -> dict:
+    """
+    Build the SchemaMakerAgent payload from the profile collected during ingestion,
+    in the same shape as ``extract_schema_payload`` but without touching the table.
+    """
+    columns = [
+        {
+            "name": name,
+            "dtype": stats["pg_type"].lower(),
+            "inferred_type": stats["inferred_type"],
+            "sample_values": stats["sample_values"],
+            "null_fraction": stats["null_fraction"],
+            "distinct_count": stats["distinct_count"],
+            "min": stats["min"],
+            "max": stats["max"],
+        }
+        for name, stats in column_profile["columns"].items()
+    ]
+
+    return {
+        "table_name": table_name,
+        "columns": columns,
+        "random_records": column_profile["random_records"]
+    }
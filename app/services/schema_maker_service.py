@@ -2,21 +2,77 @@
 from datetime import datetime
 from app.agents.schema_maker_agent import SchemaMakerAgent
 from app.models.mapping_mng import DBMapping
+from app.db.postgres import ReadSessionLocal
+from app.services.schema_extraction_service import build_schema_payload, extract_schema_payload
+from app.services.schema_cache_service import get_cached_descriptions, store_descriptions
+from app.services.message_service import refresh_schema_index
+from app.services.sql_cache_service import invalidate_sql_cache
 
 
 async def generate_and_store_schema(
     mapping: DBMapping,
-    schema_payload: dict
+    schema_payload: dict | None = None,
+    column_profile: dict | None = None
 ):
-    agent = SchemaMakerAgent()
+    if column_profile is not None:
+        mapping.column_profile = column_profile
 
-    inferred_schema = await agent.run(schema_payload)
+    if schema_payload is None and mapping.column_profile is not None:
+        schema_payload = build_schema_payload(mapping.table_name, mapping.column_profile)
 
-    mapping.schema = inferred_schema.get("schema", [])
-    mapping.random_records = inferred_schema.get("random_records", [])
+    elif schema_payload is None:
+        # Mappings ingested before profiles were collected: sample the table
+        async with ReadSessionLocal() as pg_session:
+            schema_payload = await extract_schema_payload(pg_session, mapping.table_name)
+
+    columns = schema_payload.get("columns", [])
+
+    # Columns seen before (same name, dtype and value shapes) reuse their
+    # description, only the rest go to the LLM
+    cached = await get_cached_descriptions(mapping.user_id, columns)
+    uncached = [col for col in columns if col["name"] not in cached]
+
+    print(
+        f"[generate_and_store_schema] {mapping.table_name}: "
+        f"{len(cached)} cached, {len(uncached)} to describe"
+    )
+
+    described = {}
+    random_records = schema_payload.get("random_records", [])
+
+    if uncached:
+        agent = SchemaMakerAgent()
+        inferred_schema = await agent.run({**schema_payload, "columns": uncached})
+
+        described = {col["column_name"]: col for col in inferred_schema.get("schema", [])}
+        random_records = inferred_schema.get("random_records", random_records)
+
+        await store_descriptions(mapping.user_id, uncached, inferred_schema.get("schema", []))
+
+    schema = []
+    for col in columns:
+        if col["name"] in cached:
+            entry = cached[col["name"]]
+            schema.append({
+                "column_name": col["name"],
+                "inferred_type": entry.inferred_type,
+                "sample_values": col.get("sample_values", []),
+                "description": entry.description
+            })
+        else:
+            schema.append(described[col["name"]])
+
+    mapping.schema = schema
+    mapping.random_records = random_records
     mapping.schema_status = "COMPLETED"
     mapping.created_at = datetime.utcnow()
+    mapping.updated_at = datetime.utcnow()
 
     await mapping.save()
+    await refresh_schema_index(mapping.user_id)
+    await invalidate_sql_cache(mapping.user_id, [mapping.table_name])
 
-    return inferred_schema
\ No newline at end of file
+    return {
+        "schema": schema,
+        "random_records": random_records
+    }
\ No newline at end of file
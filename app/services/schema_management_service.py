@@ -1,5 +1,10 @@
 from fastapi import HTTPException, status
+from beanie import PydanticObjectId
 from app.models.mapping_mng import DBMapping
+from app.services.schema_cache_service import store_descriptions
+from app.services.message_service import refresh_schema_index
+from app.services.sql_cache_service import invalidate_sql_cache
+from app.services.schema_extraction_service import build_schema_payload
 from datetime import datetime
 
 
@@ -27,6 +32,23 @@ async def get_schema_for_user(
     return mapping
 
 
+async def get_ingestion_job(
+    user_id: str,
+    mapping_id: str,
+) -> DBMapping:
+    mapping = None
+    if PydanticObjectId.is_valid(mapping_id):
+        mapping = await DBMapping.get(mapping_id)
+
+    if not mapping or mapping.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingestion job not found",
+        )
+
+    return mapping
+
+
 async def get_all_schemas_for_user(
     user_id: str,
 ) -> list[DBMapping]:
@@ -83,4 +105,17 @@ async def update_schema_descriptions(
     mapping.updated_at = datetime.utcnow()
 
     await mapping.save()
+
+    # Refined descriptions win over LLM ones the next time these columns show up
+    if mapping.column_profile:
+        await store_descriptions(
+            user_id,
+            build_schema_payload(mapping.table_name, mapping.column_profile)["columns"],
+            [col for col in merged_schema if col["column_name"] in updates_by_column],
+            source="USER_REFINED",
+        )
+
+    await refresh_schema_index(user_id)
+    await invalidate_sql_cache(user_id, [mapping.table_name])
+
     return mapping
\ No newline at end of file
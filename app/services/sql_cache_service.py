@@ -0,0 +1,231 @@
+# app/services/sql_cache_service.py
+import hashlib
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.sql_cache import SQLCacheEntry
+
+
+# Phrases that tie a question to the previous turn ("and per month?")
+FOLLOW_UP_OPENERS = (
+    "and", "or", "but", "also", "only", "just", "now", "then", "so", "same",
+    "what about", "how about", "instead", "except", "excluding", "without",
+)
+REFERENCE_WORDS = {
+    "it", "its", "that", "those", "these", "them", "they", "their", "same",
+    "previous", "above", "again", "instead", "also", "else", "too",
+}
+MIN_STANDALONE_WORDS = 4
+
+# Words whose presence flips the meaning of an otherwise similar question
+NEGATION_WORDS = {"not", "no", "without", "except", "excluding", "never", "non"}
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, punctuation dropped, whitespace collapsed; every word is kept."""
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+def is_standalone_question(question: str) -> bool:
+    """
+    Strict check that ``question`` means the same thing without the conversation:
+    long enough, no follow-up opener and no word pointing at an earlier turn.
+    """
+    normalized = normalize_question(question)
+    words = normalized.split()
+
+    if len(words) < MIN_STANDALONE_WORDS:
+        return False
+    if any(
+        normalized == opener or normalized.startswith(opener + " ")
+        for opener in FOLLOW_UP_OPENERS
+    ):
+        return False
+    return not set(words) & REFERENCE_WORDS
+
+
+def tables_fingerprint(tables: List[Dict[str, Any]]) -> str:
+    """Fingerprint of the table versions a question was answered against."""
+    fingerprints = sorted(table["fingerprint"] for table in tables)
+    return hashlib.sha1(json.dumps(fingerprints).encode()).hexdigest()
+
+
+def history_key(history_context: list | None) -> str:
+    """Key of the conversation so far: the user messages in ``history_context``."""
+    if not history_context:
+        return ""
+    previous = [
+        message.get("content", "")
+        for message in history_context
+        if message.get("role") == "user"
+    ]
+    return hashlib.sha1(json.dumps(previous).encode()).hexdigest()
+
+
+def cache_context_key(question: str, history_context: list | None) -> str:
+    """
+    Empty for standalone questions, so they share entries across threads;
+    anything else is cached per conversation.
+    """
+    if is_standalone_question(question):
+        return ""
+    return history_key(history_context)
+
+
+def _bigrams(tokens: List[str]) -> set:
+    return set(zip(tokens, tokens[1:])) or set(tokens)
+
+
+def _similarity(tokens: List[str], other: List[str]) -> float:
+    # Numbers ("top 5" vs "top 10", years) and negations must match exactly
+    for exact in (lambda t: t.isdigit(), lambda t: t in NEGATION_WORDS):
+        if {t for t in tokens if exact(t)} != {t for t in other if exact(t)}:
+            return 0.0
+
+    # Word pairs rather than words, so order matters
+    a, b = _bigrams(tokens), _bigrams(other)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+async def _record(outcome: str):
+    try:
+        redis = await get_redis()
+        await redis.hincrby(settings.SQL_CACHE_METRICS_KEY, outcome, 1)
+    except Exception as e:
+        print(f"[SQLCache] Failed to record {outcome}: {e}")
+
+
+async def get_cached_sql(
+    user_id: str,
+    question: str,
+    tables: List[Dict[str, Any]],
+    context_key: str = ""
+) -> SQLCacheEntry | None:
+    if not settings.SQL_CACHE_ENABLED:
+        return None
+
+    normalized = normalize_question(question)
+    if not normalized:
+        return None
+    tokens = normalized.split()
+
+    scope = {
+        "user_id": str(user_id),
+        "tables_fingerprint": tables_fingerprint(tables),
+        "context_key": context_key,
+    }
+
+    try:
+        entry = await SQLCacheEntry.find_one(
+            {**scope, "normalized_question": normalized}
+        )
+
+        if entry is None and settings.SQL_CACHE_SIMILARITY_MATCHING:
+            candidates = await SQLCacheEntry.find(scope).sort(
+                "-last_used_at"
+            ).limit(settings.SQL_CACHE_SIMILARITY_CANDIDATES).to_list()
+
+            scored = [
+                (_similarity(tokens, candidate.question_tokens), candidate)
+                for candidate in candidates
+            ]
+            scored = [item for item in scored if item[0] >= settings.SQL_CACHE_SIMILARITY]
+            if scored:
+                entry = max(scored, key=lambda item: item[0])[1]
+
+        if entry is None:
+            await _record("misses")
+            return None
+
+        await SQLCacheEntry.get_motor_collection().update_one(
+            {"_id": entry.id},
+            {"$set": {"last_used_at": datetime.utcnow()}, "$inc": {"hits": 1}},
+        )
+
+    except Exception as e:
+        print(f"[SQLCache] Lookup failed: {e}")
+        return None
+
+    await _record("hits")
+    print(f"[SQLCache] Hit for {question!r} (cached as {entry.question!r})")
+    return entry
+
+
+async def store_cached_sql(
+    user_id: str,
+    question: str,
+    tables: List[Dict[str, Any]],
+    sql: str,
+    explanation: str,
+    queries: List[str],
+    context_key: str = ""
+):
+    """Remember SQL that has executed successfully for ``question``."""
+    if not settings.SQL_CACHE_ENABLED or not queries:
+        return
+
+    normalized = normalize_question(question)
+    if not normalized:
+        return
+
+    scope = {
+        "user_id": str(user_id),
+        "tables_fingerprint": tables_fingerprint(tables),
+        "context_key": context_key,
+        "normalized_question": normalized,
+    }
+    now = datetime.utcnow()
+
+    try:
+        await SQLCacheEntry.get_motor_collection().update_one(
+            scope,
+            {
+                "$set": {
+                    "table_names": [table["table_name"] for table in tables],
+                    "question": question,
+                    "question_tokens": normalized.split(),
+                    "sql": sql,
+                    "explanation": explanation,
+                    "queries": queries,
+                    "last_used_at": now,
+                },
+                "$setOnInsert": {"hits": 0, "created_at": now},
+            },
+            upsert=True,
+        )
+    except Exception as e:
+        print(f"[SQLCache] Failed to store entry: {e}")
+
+
+async def invalidate_sql_cache(user_id: str, table_names: List[str]):
+    """Drop cached SQL touching tables that were re-ingested or re-described."""
+    try:
+        result = await SQLCacheEntry.get_motor_collection().delete_many({
+            "user_id": str(user_id),
+            "table_names": {"$in": table_names},
+        })
+        if result.deleted_count:
+            print(f"[SQLCache] Invalidated {result.deleted_count} entries for {table_names}")
+    except Exception as e:
+        print(f"[SQLCache] Invalidation failed: {e}")
+
+
+async def get_sql_cache_stats() -> dict:
+    redis = await get_redis()
+    counters = await redis.hgetall(settings.SQL_CACHE_METRICS_KEY)
+
+    hits = int(counters.get("hits", 0))
+    misses = int(counters.get("misses", 0))
+    lookups = hits + misses
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+from typing import Any, Dict
+
+from app.utils.datatype_mapper import CATEGORY_MAX_DISTINCT
+
+# Sample values / random records kept per table
+SAMPLE_SIZE = 5
+
+# Hashes kept per column for the distinct-count sketch (~1.5% error)
+DISTINCT_SKETCH_SIZE = 4096
+
+HASH_SPACE = float(2 ** 64)
+
+
+def _to_text(value: Any, pg_type: str) -> str | None:
+    if value is None or (not isinstance(value, (list, dict)) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    if isinstance(value, datetime) and pg_type == "DATE":
+        return value.date().isoformat()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    return str(value)
+
+
+def profile_chunk(
+    df: pd.DataFrame,
+    column_types: Dict[str, str],
+    seed: int | None = None
+) -> dict:
+    """
+    Summarize one converted chunk into a partial profile that ``ColumnProfiler``
+    can merge. Runs inside the process pool next to the dtype conversion.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+
+    for col in df.columns:
+        series = df[col]
+        non_null = series.dropna()
+        pg_type = column_types[col]
+
+        hashes = np.unique(
+            pd.util.hash_pandas_object(non_null, index=False).to_numpy()
+        )[:DISTINCT_SKETCH_SIZE]
+
+        values = None
+        distinct_values = non_null.unique()
+        if len(distinct_values) <= CATEGORY_MAX_DISTINCT:
+            values = {_to_text(value, pg_type) for value in distinct_values}
+
+        orderable = pg_type != "BOOLEAN" and not non_null.empty
+        columns[col] = {
+            "nulls": int(len(series) - len(non_null)),
+            "hashes": hashes,
+            "values": values,
+            "min": non_null.min() if orderable else None,
+            "max": non_null.max() if orderable else None,
+            "samples": [
+                _to_text(value, pg_type)
+                for value in distinct_values[:SAMPLE_SIZE]
+            ],
+        }
+
+    # Random keys let chunk-level samples merge into a uniform sample of all rows
+    keys = rng.random(len(df))
+    picked = np.argsort(keys)[:SAMPLE_SIZE]
+    records = [
+        (
+            float(keys[i]),
+            {col: _to_text(df[col].iloc[i], column_types[col]) for col in df.columns},
+        )
+        for i in picked
+    ]
+
+    return {
+        "rows": len(df),
+        "columns": columns,
+        "records": records,
+    }
+
+
+class ColumnProfiler:
+    """
+    Builds a column profile (samples, null rates, distinct counts, ranges) from the
+    chunks written during ingestion, so the table never has to be read back.
+    """
+
+    def __init__(self):
+        self.column_info: Dict[str, Dict[str, str]] = {}
+        self.rows = 0
+        self.columns: Dict[str, dict] = {}
+        self.records: list[tuple[float, dict]] = []
+
+    def start(self, column_info: Dict[str, Dict[str, str]]):
+        """``column_info`` is the output of ``infer_columns``."""
+        self.column_info = column_info
+        self.columns = {
+            col: {
+                "nulls": 0,
+                "hashes": np.array([], dtype=np.uint64),
+                "values": set(),
+                "min": None,
+                "max": None,
+                "samples": [],
+            }
+            for col in column_info
+        }
+
+    def add(self, partial: dict):
+        self.rows += partial["rows"]
+
+        for col, chunk_stats in partial["columns"].items():
+            stats = self.columns[col]
+            stats["nulls"] += chunk_stats["nulls"]
+
+            stats["hashes"] = np.unique(
+                np.concatenate([stats["hashes"], chunk_stats["hashes"]])
+            )[:DISTINCT_SKETCH_SIZE]
+
+            if stats["values"] is not None and chunk_stats["values"] is not None:
+                stats["values"] |= chunk_stats["values"]
+                if len(stats["values"]) > CATEGORY_MAX_DISTINCT:
+                    stats["values"] = None
+            else:
+                stats["values"] = None
+
+            if chunk_stats["min"] is not None:
+                if stats["min"] is None or chunk_stats["min"] < stats["min"]:
+                    stats["min"] = chunk_stats["min"]
+                if stats["max"] is None or chunk_stats["max"] > stats["max"]:
+                    stats["max"] = chunk_stats["max"]
+
+            for sample in chunk_stats["samples"]:
+                if len(stats["samples"]) >= SAMPLE_SIZE:
+                    break
+                if sample not in stats["samples"]:
+                    stats["samples"].append(sample)
+
+        self.records = sorted(
+            self.records + partial["records"],
+            key=lambda record: record[0],
+        )[:SAMPLE_SIZE]
+
+    @staticmethod
+    def _estimate_distinct(hashes: np.ndarray) -> int:
+        # K-minimum-values estimate; exact while fewer than k distinct hashes exist
+        if len(hashes) < DISTINCT_SKETCH_SIZE:
+            return int(len(hashes))
+        return int((DISTINCT_SKETCH_SIZE - 1) / (float(hashes[-1]) / HASH_SPACE))
+
+    def result(self) -> dict:
+        """
+        Returns:
+        {
+          "row_count": 1000,
+          "columns": {
+            "col1": {
+              "pg_type": "TEXT",
+              "inferred_type": "category",
+              "sample_values": ["a", "b"],
+              "null_fraction": 0.1,
+              "distinct_count": 3,
+              "min": "a",
+              "max": "c",
+              "values": ["a", "b", "c"]
+            },
+            ...
+          },
+          "random_records": [{"col1": "a", ...}, ...]
+        }
+        """
+        columns = {}
+
+        for col, info in self.column_info.items():
+            stats = self.columns[col]
+            pg_type = info["pg_type"]
+
+            columns[col] = {
+                "pg_type": pg_type,
+                "inferred_type": info["inferred_type"],
+                "sample_values": stats["samples"],
+                "null_fraction": round(stats["nulls"] / self.rows, 4) if self.rows else None,
+                "distinct_count": self._estimate_distinct(stats["hashes"]),
+                "min": _to_text(stats["min"], pg_type),
+                "max": _to_text(stats["max"], pg_type),
+                "values": (
+                    sorted(value for value in stats["values"] if value is not None)
+                    if stats["values"] is not None
+                    else None
+                ),
+            }
+
+        return {
+            "row_count": self.rows,
+            "columns": columns,
+            "random_records": [record for _, record in self.records],
+        }
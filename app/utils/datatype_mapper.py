@@ -1,66 +1,369 @@
+import warnings
+
 import pandas as pd
 import numpy as np
 from typing import Dict
+from pandas.tseries.api import guess_datetime_format
+
+# Share of non-null values that must parse for a column to get a typed column
+MATCH_THRESHOLD = 0.8
+
+# Rows inspected per column before a full-column confirmation pass
+SAMPLE_SIZE = 10_000
+
+# Text columns with at most this many distinct values are treated as categories
+CATEGORY_MAX_DISTINCT = 50
+CATEGORY_MAX_RATIO = 0.5
+
+# Distinct sample values a datetime format is guessed from
+FORMAT_GUESS_VALUES = 20
+
+# Text spellings pandas reads as booleans, lowercased
+BOOLEAN_VALUES = {"true": True, "false": False}
+
+# Largest scale / precision stored as NUMERIC(p, s) instead of DOUBLE PRECISION
+NUMERIC_MAX_SCALE = 6
+NUMERIC_MAX_PRECISION = 38
+
+BIGINT_MAX = 2 ** 63 - 1
+
+NUMBER_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+DATE_PATTERN = (
+    r"(?:\d{4}[-/.]\d{1,2}[-/.]\d{1,2}"
+    r"|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4}"
+    r"|\d{1,2}[ -][A-Za-z]{3,9}[ -]\d{2,4}"
+    r"|[A-Za-z]{3,9}\.? \d{1,2},? \d{4})"
+)
+TIME_PATTERN = (
+    r"(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?\s*(?:[AaPp][Mm])?"
+    r"(?:Z|[+-]\d{2}:?\d{2})?)?"
+)
+DATETIME_PATTERN = DATE_PATTERN + TIME_PATTERN
+
+SEMANTIC_TYPES = {
+    "BIGINT": "integer",
+    "DOUBLE PRECISION": "float",
+    "NUMERIC": "float",
+    "BOOLEAN": "boolean",
+    "DATE": "date",
+    "TIMESTAMP": "datetime",
+    "TEXT": "string",
+}
+
 
 def map_pandas_to_postgres(dtype) -> str:
     """Map pandas dtype to PostgreSQL type"""
-    
+
     if pd.api.types.is_integer_dtype(dtype):
         return "BIGINT"
-    
+
     elif pd.api.types.is_float_dtype(dtype):
         return "DOUBLE PRECISION"
-    
+
     elif pd.api.types.is_bool_dtype(dtype):
         return "BOOLEAN"
-    
+
     elif pd.api.types.is_datetime64_any_dtype(dtype):
         return "TIMESTAMP"
-    
+
     elif pd.api.types.is_datetime64_dtype(dtype):
         return "DATE"
-    
+
     else:
         return "TEXT"
 
 
-def infer_column_types(df: pd.DataFrame) -> Dict[str, str]:
+def numeric_scale(pg_type: str) -> int | None:
+    """Return ``s`` for a ``NUMERIC(p,s)`` type, None for any other type."""
+    if not pg_type.startswith("NUMERIC("):
+        return None
+    return int(pg_type[len("NUMERIC("):-1].split(",")[1])
+
+
+def _stratified_sample(series: pd.Series, sample_size: int) -> pd.Series:
+    """
+    Pick one random non-null value from each of ``sample_size`` equal blocks of the
+    column, so the head, middle and tail of the file are all represented.
+    """
+    non_null = series.dropna()
+
+    if len(non_null) <= sample_size:
+        return non_null
+
+    rng = np.random.default_rng(0)
+    edges = np.linspace(0, len(non_null), sample_size + 1)
+    positions = (edges[:-1] + rng.random(sample_size) * np.diff(edges)).astype(int)
+
+    return non_null.iloc[positions]
+
+
+def _is_exhaustive(sample: pd.Series, series: pd.Series) -> bool:
+    return len(sample) == series.notna().sum()
+
+
+def _classify_numeric(values: pd.Series) -> str:
+    """
+    Choose BIGINT, NUMERIC(p,s) or DOUBLE PRECISION for non-null float/int values.
+    """
+    array = values.to_numpy(dtype="float64")
+
+    if not np.isfinite(array).all():
+        return "DOUBLE PRECISION"
+
+    max_abs = float(np.abs(array).max()) if len(array) else 0.0
+    integer_digits = len(str(int(max_abs))) if max_abs >= 1 else 1
+
+    for scale in range(NUMERIC_MAX_SCALE + 1):
+        rounded = np.round(array, scale)
+        if np.all(np.abs(rounded - array) <= 1e-9 * np.maximum(1.0, np.abs(array))):
+            if scale == 0:
+                return "BIGINT" if max_abs <= BIGINT_MAX else "DOUBLE PRECISION"
+
+            precision = integer_digits + scale
+            if precision <= NUMERIC_MAX_PRECISION:
+                return f"NUMERIC({precision},{scale})"
+            break
+
+    return "DOUBLE PRECISION"
+
+
+def widen_for_stream(pg_type: str) -> str:
+    """
+    Type to create when only the leading chunks of a stream were inferred: a
+    NUMERIC keeps its scale but gets the widest precision, so larger values in
+    later chunks still fit.
+    """
+    scale = numeric_scale(pg_type)
+    if scale is None:
+        return pg_type
+    return f"NUMERIC({NUMERIC_MAX_PRECISION},{scale})"
+
+
+def fits_numeric_type(values: pd.Series, pg_type: str) -> bool:
+    """Whether non-null ``values`` fit a BIGINT or NUMERIC(p,s) column without loss."""
+    scale = 0 if pg_type == "BIGINT" else numeric_scale(pg_type)
+    array = values.to_numpy(dtype="float64")
+
+    if scale is None or not len(array):
+        return True
+    if not np.isfinite(array).all():
+        return False
+
+    if pg_type == "BIGINT":
+        limit = BIGINT_MAX
+    else:
+        precision = int(pg_type[len("NUMERIC("):-1].split(",")[0])
+        limit = 10.0 ** (precision - scale)
+    if np.abs(array).max() >= limit:
+        return False
+
+    rounded = np.round(array, scale)
+    return bool(np.all(np.abs(rounded - array) <= 1e-9 * np.maximum(1.0, np.abs(array))))
+
+
+def widened_numeric_type(values: pd.Series) -> str:
+    """
+    Type for a BIGINT/NUMERIC column whose values in a later chunk no longer fit:
+    NUMERIC with the largest scale, so one ALTER covers the rest of the stream,
+    or DOUBLE PRECISION when even that is too small.
+    """
+    widest = f"NUMERIC({NUMERIC_MAX_PRECISION},{NUMERIC_MAX_SCALE})"
+    return widest if fits_numeric_type(values.dropna(), widest) else "DOUBLE PRECISION"
+
+
+def _infer_float_column(series: pd.Series, sample_size: int) -> str:
+    sample = _stratified_sample(series, sample_size)
+    pg_type = _classify_numeric(sample)
+
+    if pg_type == "DOUBLE PRECISION" or _is_exhaustive(sample, series):
+        return pg_type
+
+    # Confirm the scale found on the sample against the whole column
+    return _classify_numeric(series.dropna())
+
+
+def _infer_datetime64_column(series: pd.Series, sample_size: int) -> str:
+    sample = _stratified_sample(series, sample_size)
+
+    if not (sample.dt.normalize() == sample).all():
+        return "TIMESTAMP"
+
+    if _is_exhaustive(sample, series):
+        return "DATE"
+
+    non_null = series.dropna()
+    return "DATE" if (non_null.dt.normalize() == non_null).all() else "TIMESTAMP"
+
+
+def _best_datetime_format(sample: pd.Series) -> str:
+    """
+    Pick the format that parses most of the sample, so the full column can be parsed
+    with one fixed format.
+
+    Candidates are guessed month-first and day-first from a few distinct values,
+    plus ISO 8601 for columns mixing dates and timestamps. Falls back to "mixed"
+    (per-value parsing) when no candidate parses enough of the sample.
+    """
+    with warnings.catch_warnings():
+        # dayfirst=True warns on values that can only be read month-first
+        warnings.simplefilter("ignore", UserWarning)
+        guesses = [
+            guess_datetime_format(value, dayfirst=dayfirst)
+            for value in sample.drop_duplicates().head(FORMAT_GUESS_VALUES)
+            for dayfirst in (False, True)
+        ]
+    candidates = dict.fromkeys(["ISO8601", *(fmt for fmt in guesses if fmt)])
+
+    scores = {
+        fmt: pd.to_datetime(sample, format=fmt, errors="coerce").notna().mean()
+        for fmt in candidates
+    }
+    best = max(scores, key=scores.get)
+
+    return best if scores[best] > MATCH_THRESHOLD else "mixed"
+
+
+def parse_datetime_column(
+    series: pd.Series,
+    datetime_format: str | None = None
+) -> pd.Series:
+    """
+    Parse a column to datetime64 with a single format (NaT where it does not parse).
+
+    Pass the ``datetime_format`` stored by ``infer_columns`` so every chunk of a file
+    is read the same way, e.g. 01/02/2024 stays day-first. Without it the format
+    is picked from a sample of ``series``.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series
+
+    text_col = series.astype(str).str.strip().where(series.notna())
+
+    if datetime_format is None:
+        sample = _stratified_sample(text_col, SAMPLE_SIZE)
+        if sample.empty:
+            return pd.to_datetime(text_col, errors="coerce")
+        datetime_format = _best_datetime_format(sample)
+
+    return pd.to_datetime(text_col, format=datetime_format, errors="coerce")
+
+
+def _infer_text_column(
+    series: pd.Series,
+    sample_size: int
+) -> tuple[str, bool, str | None]:
+    """
+    Classify an object/string column. Returns the PostgreSQL type, whether the
+    column looks like a low-cardinality category and, for dates, the format
+    the column was parsed with.
+    """
+    sample = _stratified_sample(series, sample_size)
+
+    if sample.empty:
+        return "TEXT", False, None
+
+    text_sample = sample.astype(str).str.strip()
+
+    # --- Booleans: True / False as text, e.g. from chunks read as strings
+    if text_sample.str.lower().isin(BOOLEAN_VALUES).all():
+        if series.dropna().astype(str).str.strip().str.lower().isin(BOOLEAN_VALUES).all():
+            return "BOOLEAN", False, None
+
+    # --- Numbers: regex on the sample, one to_numeric pass to confirm
+    if text_sample.str.fullmatch(NUMBER_PATTERN).mean() > MATCH_THRESHOLD:
+        numeric_col = pd.to_numeric(series, errors="coerce")
+        non_null = numeric_col.dropna()
+
+        if len(non_null) / series.notna().sum() > MATCH_THRESHOLD:
+            return _classify_numeric(non_null), False, None
+
+    # --- Dates: regex on the sample, one to_datetime pass with a fixed format
+    is_datetime = text_sample.str.fullmatch(DATETIME_PATTERN)
+    if is_datetime.mean() > MATCH_THRESHOLD:
+        datetime_format = _best_datetime_format(text_sample[is_datetime])
+        datetime_col = parse_datetime_column(series, datetime_format)
+        non_null = datetime_col.dropna()
+
+        if len(non_null) / series.notna().sum() > MATCH_THRESHOLD:
+            if (non_null.dt.normalize() == non_null).all():
+                return "DATE", False, datetime_format
+            return "TIMESTAMP", False, datetime_format
+
+    # --- Categories: few distinct values in the sample, confirmed on the column
+    sample_distinct = text_sample.nunique()
+    if (
+        sample_distinct <= CATEGORY_MAX_DISTINCT
+        and sample_distinct / len(text_sample) <= CATEGORY_MAX_RATIO
+    ):
+        is_category = (
+            _is_exhaustive(sample, series)
+            or series.nunique() <= CATEGORY_MAX_DISTINCT
+        )
+        return "TEXT", is_category, None
+
+    return "TEXT", False, None
+
+
+def infer_columns(
+    df: pd.DataFrame,
+    sample_size: int = SAMPLE_SIZE
+) -> Dict[str, Dict[str, str]]:
     """
-    Infer PostgreSQL column types from DataFrame    
+    Infer the PostgreSQL type and semantic type of every column.
+
+    Each column is classified on a stratified sample first and only re-checked
+    against the full column when the sample cannot settle it, so inference time
+    grows with ``sample_size`` rather than the row count.
+
     Returns:
-        Dictionary mapping column names to PostgreSQL types
+        {"col": {"pg_type": "NUMERIC(10,2)", "inferred_type": "float"}, ...}
+
+    Text columns parsed as dates also get a "datetime_format" to convert with.
     """
-    column_types = {}
-    
+    columns = {}
+
     for col in df.columns:
-        dtype = df[col].dtype
-        
-        if dtype == 'object':
-            try:
-                numeric_col = pd.to_numeric(df[col], errors='coerce')
-                non_null_count = numeric_col.notna().sum()
-                
-                if non_null_count / len(df) > 0.8:
-                    if (numeric_col == numeric_col.astype(int)).all():
-                        column_types[col] = "BIGINT"
-                    else:
-                        column_types[col] = "DOUBLE PRECISION"
-                    continue
-            except:
-                pass
-            
-            try:
-                datetime_col = pd.to_datetime(df[col], errors='coerce')
-                non_null_count = datetime_col.notna().sum()
-                
-                if non_null_count / len(df) > 0.8:
-                    column_types[col] = "TIMESTAMP"
-                    continue
-            except:
-                pass
-            
-            column_types[col] = "TEXT"
+        series = df[col]
+        dtype = series.dtype
+        is_category = False
+        datetime_format = None
+
+        if pd.api.types.is_bool_dtype(dtype):
+            pg_type = "BOOLEAN"
+
+        elif pd.api.types.is_integer_dtype(dtype):
+            pg_type = "BIGINT"
+
+        elif pd.api.types.is_float_dtype(dtype):
+            pg_type = _infer_float_column(series, sample_size)
+
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            pg_type = _infer_datetime64_column(series, sample_size)
+
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            pg_type, is_category, datetime_format = _infer_text_column(series, sample_size)
+
         else:
-            column_types[col] = map_pandas_to_postgres(dtype)
-    
-    return column_types
\ No newline at end of file
+            pg_type = map_pandas_to_postgres(dtype)
+
+        base_type = "NUMERIC" if numeric_scale(pg_type) is not None else pg_type
+        columns[col] = {
+            "pg_type": pg_type,
+            "inferred_type": "category" if is_category else SEMANTIC_TYPES[base_type],
+        }
+        if datetime_format:
+            columns[col]["datetime_format"] = datetime_format
+
+    return columns
+
+
+def infer_column_types(df: pd.DataFrame) -> Dict[str, str]:
+    """
+    Infer PostgreSQL column types from DataFrame
+    Returns:
+        Dictionary mapping column names to PostgreSQL types
+    """
+    return {
+        col: info["pg_type"]
+        for col, info in infer_columns(df).items()
+    }
@@ -1,10 +1,17 @@
+import asyncio
+import os
+import shutil
+import tempfile
 import pandas as pd
+from typing import Iterator
 from fastapi import UploadFile, HTTPException, status
+from app.core.process_pool import run_cpu_bound
 
 ALLOWED_EXTENSIONS = {"csv", "xlsx", "xls"}
+STREAMABLE_EXTENSIONS = {"csv"}
 
 
-async def parse_file(file: UploadFile) -> pd.DataFrame:
+def get_extension(file: UploadFile) -> str:
     extension = file.filename.split(".")[-1].lower()
 
     if extension not in ALLOWED_EXTENSIONS:
@@ -13,27 +20,90 @@ async def parse_file(file: UploadFile) -> pd.DataFrame:
             detail="Only CSV and Excel files are supported"
         )
 
+    return extension
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = df.columns.str.strip().str.replace(r'[^\w\s]', '_', regex=True).str.replace(r'\s+', '_', regex=True)
+    return df
+
+
+def read_dataframe(path: str, extension: str) -> pd.DataFrame:
+    """Read a spooled upload from disk. Runs inside the process pool."""
+    if extension == "csv":
+        df = pd.read_csv(path, parse_dates=True)
+    else:
+        df = pd.read_excel(path)
+
+    return normalize_columns(df.infer_objects())
+
+
+async def spool_to_disk(file: UploadFile, extension: str) -> str:
+    """
+    Copy the upload to a named temp file so a worker process can read it by path.
+    """
+    def copy() -> str:
+        file.file.seek(0)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{extension}") as tmp:
+            shutil.copyfileobj(file.file, tmp, 1024 * 1024)
+            return tmp.name
+
+    return await asyncio.to_thread(copy)
+
+
+async def parse_file(file: UploadFile) -> pd.DataFrame:
+    extension = get_extension(file)
+    path = await spool_to_disk(file, extension)
+
     try:
-        if extension == "csv":
-            df = pd.read_csv(file.file, parse_dates=True)
-            
-            df = df.infer_objects()
-            
-        else:
-            df = pd.read_excel(file.file)
-            df = df.infer_objects()
-            
+        df = await run_cpu_bound(read_dataframe, path, extension)
+
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid or corrupted file: {str(e)}"
         )
+    finally:
+        os.unlink(path)
 
     if df.empty:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Uploaded file is empty"
         )
-    df.columns = df.columns.str.strip().str.replace(r'[^\w\s]', '_', regex=True).str.replace(r'\s+', '_', regex=True)
 
-    return df
\ No newline at end of file
+    return df
+
+
+def iter_csv_chunks(file: UploadFile, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV upload ``chunk_size`` rows at a time so only one chunk is ever in memory.
+
+    Every column is read as text (empty cells as NaN): pandas would otherwise type
+    each chunk on its own, e.g. read a code column as integers in a chunk where
+    all codes happen to be digits. ``infer_columns`` and ``convert_dataframe``
+    type the columns once for the whole stream.
+    """
+    try:
+        reader = pd.read_csv(file.file, chunksize=chunk_size, dtype=str)
+
+        is_empty = True
+        for chunk in reader:
+            if chunk.empty:
+                continue
+            is_empty = False
+            yield normalize_columns(chunk)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid or corrupted file: {str(e)}"
+        )
+
+    if is_empty:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file is empty"
+        )
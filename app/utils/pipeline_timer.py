@@ -0,0 +1,27 @@
+# app/utils/pipeline_timer.py
+import time
+from typing import Any, Awaitable, Dict
+
+
+class PipelineTimer:
+    """Wall-clock duration of each stage of a request, including concurrent ones."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    async def timed(self, stage: str, awaitable: Awaitable[Any]) -> Any:
+        stage_started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.stages[stage] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "elapsed_ms": self.elapsed_ms(),
+            "stages_ms": dict(self.stages),
+        }
@@ -0,0 +1,306 @@
+# app/utils/query_result.py
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.utils.token_estimator import estimate_tokens
+
+# Column kinds and how each is held in memory:
+#   integer  -> int64, or float64 with NaN for None
+#   number   -> float64 (None as NaN)
+#   decimal  -> object array of the exact Decimal values (None kept); aggregate
+#               math goes through ``float_array``
+#   datetime -> datetime64[us] (None as NaT), date -> datetime64[D]
+#   text     -> object array of the original values (str, bool, ...)
+INTEGER, NUMBER, DECIMAL = "integer", "number", "decimal"
+DATETIME, DATE, TEXT = "datetime", "date", "text"
+NUMERIC_KINDS = (INTEGER, NUMBER, DECIMAL)
+
+# Longest cell value shown to the LLM
+MAX_CELL_CHARS = 80
+
+# First line of a render that had to leave rows out
+SUMMARY_HEADER = "Column summary over all"
+
+
+def _kind_of(values: Sequence[Any]) -> str:
+    value = next((v for v in values if v is not None), None)
+
+    if isinstance(value, bool) or value is None:
+        return TEXT
+    if isinstance(value, int):
+        return INTEGER
+    if isinstance(value, Decimal):
+        return DECIMAL
+    if isinstance(value, float):
+        return NUMBER
+    if isinstance(value, datetime):
+        return DATETIME if value.tzinfo is None else TEXT
+    if isinstance(value, date):
+        return DATE
+    return TEXT
+
+
+def _to_array(values: Sequence[Any], kind: str) -> tuple[np.ndarray, str]:
+    """Array for a column of ``kind``; falls back to text when values are mixed."""
+    raw = np.empty(len(values), dtype=object)
+    raw[:] = values
+
+    try:
+        if kind == INTEGER and not any(type(v) is not int for v in values if v is not None):
+            missing = raw == None  # noqa: E711 - element-wise comparison
+            try:
+                if not missing.any():
+                    return raw.astype(np.int64), kind
+                raw[~missing].astype(np.int64)
+            except OverflowError:
+                kind = NUMBER
+            else:
+                raw[missing] = np.nan
+                return raw.astype(np.float64), kind
+
+        if kind == DECIMAL:
+            if all(isinstance(v, Decimal) for v in values if v is not None):
+                return raw, kind
+            kind = NUMBER
+
+        if kind in NUMERIC_KINDS:
+            raw[raw == None] = np.nan  # noqa: E711
+            return raw.astype(np.float64), NUMBER
+
+        if kind in (DATETIME, DATE):
+            return raw.astype("datetime64[us]" if kind == DATETIME else "datetime64[D]"), kind
+
+    except (TypeError, ValueError):
+        pass
+
+    return raw, TEXT
+
+
+def float_array(array: np.ndarray, kind: str) -> np.ndarray:
+    """float64 view of a numeric column (None as NaN), for aggregates only."""
+    if kind == DECIMAL:
+        values = array.copy()
+        values[values == None] = np.nan  # noqa: E711
+        return values.astype(np.float64)
+    return array.astype(np.float64, copy=False)
+
+
+def _json_column(array: np.ndarray, kind: str) -> List[Any]:
+    if kind == DECIMAL:
+        # Strings, so exact values survive JSON
+        return [None if value is None else format(value, "f") for value in array]
+
+    if kind in NUMERIC_KINDS:
+        if array.dtype == np.int64:
+            return array.tolist()
+        missing = np.isnan(array)
+        if kind == INTEGER:
+            values = np.where(missing, 0, array).astype(np.int64).astype(object)
+        else:
+            values = array.astype(object)
+        values[missing] = None
+        return values.tolist()
+
+    if kind in (DATETIME, DATE):
+        values = np.datetime_as_string(array, unit="s" if kind == DATETIME else "D").astype(object)
+        values[np.isnat(array)] = None
+        return values.tolist()
+
+    return [
+        value.isoformat() if isinstance(value, (date, datetime))
+        else float(value) if isinstance(value, Decimal)
+        else value
+        for value in array
+    ]
+
+
+def format_number(value: float | Decimal) -> str:
+    if isinstance(value, Decimal):
+        return f"{value:,f}"
+    if float(value).is_integer():
+        return f"{value:,.0f}"
+    return f"{value:,.4g}" if abs(value) < 1000 else f"{value:,.2f}"
+
+
+def _format_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    text = str(value)
+    if len(text) > MAX_CELL_CHARS:
+        text = text[:MAX_CELL_CHARS - 1] + "…"
+    return text.replace("|", "/").replace("\n", " ")
+
+
+class QueryResult:
+    """
+    Column-oriented query result. Values stay in one NumPy array per column;
+    JSON rows are only built when somebody asks for them.
+    """
+
+    def __init__(self, columns: List[str], arrays: List[np.ndarray], kinds: List[str]):
+        self.columns = columns
+        self.arrays = arrays
+        self.kinds = kinds
+        self._rows: List[List[Any]] | None = None
+
+    @classmethod
+    def from_rows(cls, columns: List[str], rows: Sequence[Sequence[Any]]) -> "QueryResult":
+        column_values = list(zip(*rows)) if rows else [() for _ in columns]
+        arrays, kinds = [], []
+
+        for values in column_values:
+            array, kind = _to_array(values, _kind_of(values))
+            arrays.append(array)
+            kinds.append(kind)
+
+        return cls(list(columns), arrays, kinds)
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "QueryResult":
+        """Inverse of ``to_payload``."""
+        arrays, kinds = [], []
+
+        for values, kind in zip(payload["values"], payload["kinds"]):
+            if kind in (DATETIME, DATE):
+                array = np.array(
+                    [v if v is not None else "NaT" for v in values],
+                    dtype="datetime64[us]" if kind == DATETIME else "datetime64[D]",
+                )
+            elif kind == DECIMAL:
+                array, kind = _to_array(
+                    [None if v is None else Decimal(v) for v in values], kind
+                )
+            else:
+                array, kind = _to_array(values, kind)
+            arrays.append(array)
+            kinds.append(kind)
+
+        return cls(payload["columns"], arrays, kinds)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """JSON-safe, column-oriented form, e.g. for the result cache."""
+        return {
+            "columns": self.columns,
+            "kinds": self.kinds,
+            "values": [
+                _json_column(array, kind)
+                for array, kind in zip(self.arrays, self.kinds)
+            ],
+        }
+
+    @property
+    def row_count(self) -> int:
+        return len(self.arrays[0]) if self.arrays else 0
+
+    def rows(self) -> List[List[Any]]:
+        """JSON-safe rows, built on first use."""
+        if self._rows is None:
+            values = self.to_payload()["values"]
+            self._rows = [list(row) for row in zip(*values)]
+        return self._rows
+
+    def iter_rows(self, batch_size: int = 64):
+        """JSON-safe rows, converted a batch at a time."""
+        if self._rows is not None:
+            yield from self._rows
+            return
+
+        for start in range(0, self.row_count, batch_size):
+            values = [
+                _json_column(array[start:start + batch_size], kind)
+                for array, kind in zip(self.arrays, self.kinds)
+            ]
+            for row in zip(*values):
+                yield list(row)
+
+    def column_summary(self, index: int, top_n: int = 5) -> str:
+        name, array, kind = self.columns[index], self.arrays[index], self.kinds[index]
+
+        if kind in NUMERIC_KINDS:
+            if kind == DECIMAL:
+                # Exact min / max / sum; only the mean is approximate
+                values = [value for value in array if value is not None]
+                total = sum(values, Decimal(0))
+                stats = None
+                if values:
+                    stats = (min(values), max(values), float(total) / len(values), total)
+            else:
+                values = array[~np.isnan(array)] if array.dtype != np.int64 else array
+                stats = (values.min(), values.max(), values.mean(), values.sum()) if len(values) else None
+
+            nulls = len(array) - len(values)
+            if stats is None:
+                return f"{name} ({kind}): all empty"
+            low, high, mean, total = stats
+            summary = (
+                f"{name} ({kind}): min {format_number(low)}, "
+                f"max {format_number(high)}, mean {format_number(mean)}, "
+                f"sum {format_number(total)}"
+            )
+            return summary + (f", {nulls} empty" if nulls else "")
+
+        if kind in (DATETIME, DATE):
+            values = array[~np.isnat(array)]
+            if not len(values):
+                return f"{name} ({kind}): all empty"
+            unit = "s" if kind == DATETIME else "D"
+            return (
+                f"{name} ({kind}): {np.datetime_as_string(values.min(), unit=unit)} "
+                f"to {np.datetime_as_string(values.max(), unit=unit)}"
+            )
+
+        try:
+            counts = Counter(value for value in array if value is not None)
+        except TypeError:  # lists / dicts from json or array columns
+            counts = Counter(str(value) for value in array if value is not None)
+        top = ", ".join(
+            f"{_format_cell(value)} ({count})"
+            for value, count in counts.most_common(top_n)
+        )
+        return f"{name} (text): {len(counts)} distinct; most common: {top}"
+
+    def render(self, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+        """
+        Compact text for the LLM: a pipe-separated table of as many rows as fit in
+        ``max_tokens``, preceded by per-column aggregates when rows had to be left out.
+        """
+        if not self.row_count:
+            return "(no rows)"
+
+        header = " | ".join(self.columns)
+        lines = [header]
+        budget = max_tokens - estimate_tokens(header, model)
+
+        summary = [self.column_summary(i) for i in range(len(self.columns))]
+        summary_tokens = estimate_tokens("\n".join(summary), model)
+
+        costs = []
+        used = 0
+        for row in self.iter_rows():
+            line = " | ".join(_format_cell(value) for value in row)
+            cost = estimate_tokens(line, model) + 1
+            if used + cost > budget:
+                break
+            lines.append(line)
+            costs.append(cost)
+            used += cost
+
+        if len(costs) == self.row_count:
+            return "\n".join(lines)
+
+        # Not everything fits: make room for the column summary
+        while costs and used > budget - summary_tokens:
+            used -= costs.pop()
+            lines.pop()
+
+        return "\n".join([
+            f"{SUMMARY_HEADER} {self.row_count} rows:",
+            *(f"- {line}" for line in summary),
+            "",
+            f"First {len(costs)} of {self.row_count} rows:",
+            *lines,
+        ])
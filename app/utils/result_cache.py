@@ -0,0 +1,145 @@
+# app/utils/result_cache.py
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import sqlglot
+import zstandard
+from sqlglot import exp
+
+from app.core.config import settings
+from app.core.redis import get_binary_redis
+
+# First byte of every stored payload
+RAW = b"\x00"
+ZSTD = b"\x01"
+
+# Results of these depend on when the query runs, not on the data
+VOLATILE_FUNCTIONS = re.compile(
+    r"\b(random|now|current_date|current_time|current_timestamp|localtime|"
+    r"localtimestamp|clock_timestamp|statement_timestamp|timeofday|gen_random_uuid)\b",
+    re.IGNORECASE,
+)
+
+
+def canonicalize_sql(sql: str) -> tuple[str, List[str]] | None:
+    """
+    Canonical text of ``sql`` and the tables it reads, or None when it cannot be
+    cached (unparseable, several statements, volatile functions).
+    """
+    try:
+        statements = sqlglot.parse(sql, read="postgres")
+    except Exception:
+        return None
+
+    statements = [statement for statement in statements if statement is not None]
+    if len(statements) != 1:
+        return None
+
+    expression = statements[0]
+    canonical = expression.sql(dialect="postgres", normalize=True, comments=False)
+    if VOLATILE_FUNCTIONS.search(canonical):
+        return None
+
+    cte_names = {cte.alias for cte in expression.find_all(exp.CTE)}
+    tables = sorted({
+        table.name
+        for table in expression.find_all(exp.Table)
+        if table.name and table.name not in cte_names
+    })
+
+    return canonical, tables
+
+
+def _encode(result: Dict[str, Any]) -> bytes:
+    data = json.dumps(result, separators=(",", ":"), default=str).encode()
+    if len(data) >= settings.RESULT_CACHE_COMPRESS_MIN_BYTES:
+        return ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return RAW + data
+
+
+def _decode(payload: bytes) -> Dict[str, Any]:
+    data = payload[1:]
+    if payload[:1] == ZSTD:
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return json.loads(data)
+
+
+class ResultCache:
+    """
+    LRU of query results bounded by the size of the stored payloads, optionally
+    backed by Redis so results are shared between workers.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    @staticmethod
+    def make_key(canonical_sql: str, versions: Dict[str, str], max_rows: int | None) -> str:
+        key = json.dumps([canonical_sql, sorted(versions.items()), max_rows])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _put_local(self, key: str, payload: bytes):
+        if len(payload) > self.max_bytes // 4:
+            return
+
+        if key in self.entries:
+            self.size -= len(self.entries.pop(key))
+
+        self.entries[key] = payload
+        self.size += len(payload)
+
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    async def get(self, key: str) -> Dict[str, Any] | None:
+        payload = self.entries.get(key)
+        if payload is not None:
+            self.entries.move_to_end(key)
+            return _decode(payload)
+
+        if settings.RESULT_CACHE_REDIS:
+            try:
+                redis = await get_binary_redis()
+                payload = await redis.get(settings.RESULT_CACHE_REDIS_PREFIX + key)
+            except Exception as e:
+                print(f"[ResultCache] Redis lookup failed: {e}")
+                payload = None
+
+            if payload is not None:
+                self._put_local(key, payload)
+                return _decode(payload)
+
+        return None
+
+    async def set(self, key: str, result: Dict[str, Any]):
+        payload = _encode(result)
+        self._put_local(key, payload)
+
+        if settings.RESULT_CACHE_REDIS:
+            try:
+                redis = await get_binary_redis()
+                await redis.set(
+                    settings.RESULT_CACHE_REDIS_PREFIX + key,
+                    payload,
+                    ex=settings.RESULT_CACHE_REDIS_TTL,
+                )
+            except Exception as e:
+                print(f"[ResultCache] Redis store failed: {e}")
+
+
+result_cache: ResultCache | None = None
+
+
+def get_result_cache() -> ResultCache:
+    global result_cache
+
+    if result_cache is None:
+        result_cache = ResultCache(settings.RESULT_CACHE_MAX_BYTES)
+
+    return result_cache
@@ -0,0 +1,175 @@
+# app/utils/result_summarizer.py
+import re
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from app.utils.query_result import (
+    QueryResult,
+    NUMERIC_KINDS,
+    DATE,
+    DATETIME,
+    TEXT,
+    SUMMARY_HEADER,
+    float_array,
+    format_number,
+)
+from app.utils.token_estimator import estimate_tokens
+
+# Robust z-score (median / MAD) above which a value is reported as an outlier
+OUTLIER_Z = 3.5
+
+# Identifier columns are numbers, but summing or ranking them means nothing
+ID_COLUMN = re.compile(r"(^|[_\s])id$", re.IGNORECASE)
+
+
+def _measures(data: QueryResult) -> List[str]:
+    return [
+        name
+        for name, kind in zip(data.columns, data.kinds)
+        if kind in NUMERIC_KINDS and not ID_COLUMN.search(name)
+    ][:3]
+
+
+def _first_of(data: QueryResult, kinds: tuple) -> str | None:
+    return next(
+        (name for name, kind in zip(data.columns, data.kinds) if kind in kinds),
+        None,
+    )
+
+
+def _rankings(frame: pd.DataFrame, label: str, measures: List[str], top_n: int) -> List[str]:
+    lines = []
+
+    for measure in measures[:2]:
+        totals = frame.groupby(label, sort=False)[measure].sum(min_count=1).dropna()
+        if len(totals) < 2:
+            continue
+
+        grand_total = totals.sum()
+        ranked = totals.sort_values(ascending=False)
+
+        def describe(items) -> str:
+            return ", ".join(
+                f"{name} {format_number(value)}"
+                + (f" ({value / grand_total:.0%})" if grand_total > 0 and value >= 0 else "")
+                for name, value in items
+            )
+
+        lines.append(
+            f"- {measure} by {label} ({len(totals)} groups, total {format_number(grand_total)}): "
+            f"top {describe(ranked.head(top_n).items())}"
+        )
+        if len(ranked) > top_n:
+            lines.append(f"  bottom {describe(ranked.tail(min(3, len(ranked) - top_n)).items())}")
+
+    return lines
+
+
+def _trends(frame: pd.DataFrame, date_column: str, measures: List[str], unit: str) -> List[str]:
+    lines = []
+
+    for measure in measures[:2]:
+        series = frame.groupby(date_column)[measure].sum(min_count=1).dropna().sort_index()
+        if len(series) < 3:
+            continue
+
+        values = series.to_numpy(dtype=np.float64)
+        labels = np.datetime_as_string(series.index.to_numpy(), unit=unit)
+        deltas = np.diff(values)
+
+        # Compare the medians of the first and last thirds, so a single spike
+        # does not decide the direction
+        third = max(1, len(values) // 3)
+        start, end = np.median(values[:third]), np.median(values[-third:])
+        direction = "stable"
+        if abs(end - start) > 0.05 * (abs(start) or 1):
+            direction = "increasing" if end > start else "decreasing"
+
+        change = (
+            f" ({(values[-1] - values[0]) / abs(values[0]):+.1%})" if values[0] else ""
+        )
+        rise, drop, peak = int(deltas.argmax()), int(deltas.argmin()), int(values.argmax())
+
+        lines.append(
+            f"- {measure} over {date_column} ({len(values)} periods, {direction}): "
+            f"{labels[0]} {format_number(values[0])} -> {labels[-1]} {format_number(values[-1])}{change}; "
+            f"peak {labels[peak]} {format_number(values[peak])}; "
+            f"largest rise {labels[rise + 1]} {format_number(deltas[rise])}; "
+            f"largest drop {labels[drop + 1]} {format_number(deltas[drop])}"
+        )
+
+    return lines
+
+
+def _outliers(frame: pd.DataFrame, label: str | None, measures: List[str]) -> List[str]:
+    lines = []
+
+    for measure in measures:
+        values = frame[measure].to_numpy(dtype=np.float64)
+        median = np.nanmedian(values)
+        mad = np.nanmedian(np.abs(values - median))
+        if not mad or np.isnan(mad):
+            continue
+
+        z = 0.6745 * (values - median) / mad
+        flagged = np.flatnonzero(np.abs(np.nan_to_num(z)) > OUTLIER_Z)
+        if not len(flagged):
+            continue
+
+        flagged = flagged[np.argsort(-np.abs(z[flagged]))][:5]
+        items = ", ".join(
+            (f"{frame[label].iat[i]} " if label else f"row {i + 1} ")
+            + format_number(values[i])
+            for i in flagged
+        )
+        lines.append(
+            f"- {measure}: {len(flagged)} unusual value(s) vs median {format_number(median)}: {items}"
+        )
+
+    return lines
+
+
+def summarize_result(data: QueryResult, max_tokens: int, top_n: int = 5) -> str:
+    """
+    Text handed to ResponseAgent for ``data``. Results that fit in ``max_tokens``
+    are passed as-is; larger ones become a digest computed locally (group
+    rankings, trends over the first date column, outliers) followed by the
+    column summary and as many sample rows as the remaining budget allows.
+    """
+    full = data.render(max_tokens)
+    if not full.startswith(SUMMARY_HEADER) or len(set(data.columns)) != len(data.columns):
+        return full
+
+    # Aggregates run on floats; exact decimals stay in the rendered rows
+    frame = pd.DataFrame({
+        name: float_array(array, kind) if kind in NUMERIC_KINDS else array
+        for name, array, kind in zip(data.columns, data.arrays, data.kinds)
+    }, copy=False)
+
+    measures = _measures(data)
+    label = _first_of(data, (TEXT,))
+    date_column = _first_of(data, (DATE, DATETIME))
+
+    sections = []
+    if measures and label:
+        sections.append(("Rankings", _rankings(frame, label, measures, top_n)))
+    if measures and date_column:
+        unit = "D" if data.kinds[data.columns.index(date_column)] == DATE else "s"
+        sections.append(("Trends", _trends(frame, date_column, measures, unit)))
+    if measures:
+        sections.append(("Outliers", _outliers(frame, label, measures)))
+
+    digest = [
+        line
+        for title, lines in sections
+        if lines
+        for line in [f"{title} (computed over all {data.row_count} rows):", *lines, ""]
+    ]
+    if not digest:
+        return full
+
+    digest_text = "\n".join(digest)
+    remaining = max_tokens - estimate_tokens(digest_text, "gpt-4o-mini")
+    return digest_text + "\n" + data.render(max(remaining, max_tokens // 4))
@@ -0,0 +1,259 @@
+# app/utils/schema_index.py
+import hashlib
+import json
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+STOPWORDS = {
+    "a", "all", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "each", "for", "from", "give", "has", "have", "how", "i", "in", "is", "it",
+    "list", "many", "me", "much", "my", "of", "on", "or", "per", "show", "tell",
+    "than", "that", "the", "there", "this", "to", "was", "we", "what", "when",
+    "where", "which", "who", "with", "you",
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Field weights: a hit on a column name counts more than one in a description
+NAME_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+SAMPLE_WEIGHT = 1
+
+# Column names that usually identify an entity and can be joined on
+JOIN_KEY_PATTERN = re.compile(r"(^|_)(id|key|code|email|no|number|sku)$", re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with snake_case/camelCase split and plurals folded."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", str(text))
+    tokens = []
+    for token in re.findall(r"[a-z0-9]+", text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _trigram_vector(text: str) -> Counter:
+    vector = Counter()
+    for word in tokenize(text):
+        padded = f" {word} "
+        vector.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return vector
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def tables_signature(tables: List[Dict[str, Any]]) -> str:
+    payload = json.dumps(
+        [(table["table_name"], table.get("schema")) for table in tables],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class SchemaIndex:
+    """
+    Ranks a user's tables against a question.
+
+    Every column is a BM25 document built from its name, description and sample
+    values; a table scores by its best columns. Character trigram vectors act as
+    cheap local embeddings so "vendors" still finds "Vendor_Name".
+    """
+
+    def __init__(self, tables: List[Dict[str, Any]]):
+        self.tables = {table["table_name"]: table for table in tables}
+        self.signature = tables_signature(tables)
+
+        self.docs = []  # (table_name, column_name, term counts, trigram vector)
+        for table in tables:
+            for col in table.get("schema") or []:
+                name = col["column_name"]
+                description = col.get("description") or ""
+                samples = " ".join(str(v) for v in col.get("sample_values") or [])
+
+                terms = Counter()
+                for token in tokenize(name):
+                    terms[token] += NAME_WEIGHT
+                for token in tokenize(description):
+                    terms[token] += DESCRIPTION_WEIGHT
+                for token in tokenize(samples):
+                    terms[token] += SAMPLE_WEIGHT
+
+                self.docs.append((
+                    table["table_name"],
+                    name,
+                    terms,
+                    _trigram_vector(f"{name} {description}"),
+                ))
+
+        self.avg_length = (
+            sum(sum(terms.values()) for _, _, terms, _ in self.docs) / len(self.docs)
+            if self.docs else 0.0
+        )
+
+        document_frequency = Counter()
+        for _, _, terms, _ in self.docs:
+            document_frequency.update(terms.keys())
+
+        n = len(self.docs)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def _bm25(self, query_terms: List[str], terms: Counter) -> float:
+        length = sum(terms.values())
+        score = 0.0
+        for term in query_terms:
+            tf = terms.get(term)
+            if not tf:
+                continue
+            score += self.idf[term] * tf * (K1 + 1) / (
+                tf + K1 * (1 - B + B * length / self.avg_length)
+            )
+        return score
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Returns tables ordered by relevance, best first:
+        [{"table_name": "tbl_x", "score": 1.7, "columns": ["Vendor", ...]}, ...]
+        """
+        query_terms = tokenize(query)
+        query_vector = _trigram_vector(query)
+        if not query_terms:
+            return []
+
+        bm25_scores = [self._bm25(query_terms, terms) for _, _, terms, _ in self.docs]
+        top_bm25 = max(bm25_scores, default=0.0) or 1.0
+
+        column_scores = defaultdict(list)
+        for (table_name, column_name, _, vector), bm25 in zip(self.docs, bm25_scores):
+            score = bm25 / top_bm25
+            if settings.SCHEMA_INDEX_EMBEDDINGS:
+                score += settings.SCHEMA_INDEX_EMBEDDING_WEIGHT * _cosine(query_vector, vector)
+            column_scores[table_name].append((score, column_name))
+
+        results = []
+        for table_name, scores in column_scores.items():
+            scores.sort(reverse=True)
+            best = scores[:3]
+            score = sum(s for s, _ in best)
+            if score < settings.SCHEMA_INDEX_MIN_SCORE:
+                continue
+            results.append({
+                "table_name": table_name,
+                "score": round(score, 4),
+                "columns": [name for s, name in best if s > 0],
+            })
+
+        results.sort(key=lambda result: result["score"], reverse=True)
+        return results
+
+    def join_candidates(self, table_names: List[str]) -> List[Dict[str, str]]:
+        """Key-like columns shared between the given tables and any other table."""
+        columns_by_name = defaultdict(list)
+        for table_name, table in self.tables.items():
+            for col in table.get("schema") or []:
+                name = col["column_name"]
+                if JOIN_KEY_PATTERN.search(name):
+                    columns_by_name[name.lower()].append((table_name, name))
+
+        candidates = []
+        for owners in columns_by_name.values():
+            for table_name, column in owners:
+                if table_name not in table_names:
+                    continue
+                for other_table, other_column in owners:
+                    if other_table == table_name:
+                        continue
+                    candidates.append({
+                        "table_name": table_name,
+                        "column": column,
+                        "other_table": other_table,
+                        "other_column": other_column,
+                    })
+        return candidates
+
+    def select_tables(
+        self,
+        question: str,
+        history_context: list | None = None,
+        top_k: int | None = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The top-k tables for ``question`` plus the tables they can join with, each
+        annotated with its ``join_candidates``. Falls back to the conversation and
+        finally to every table when nothing in the question matches.
+        """
+        top_k = top_k or settings.SCHEMA_INDEX_TOP_K
+        if len(self.tables) <= top_k:
+            return list(self.tables.values())
+
+        ranked = self.search(question)
+        if not ranked and history_context:
+            # Follow-ups like "and per month?" only make sense with the history
+            previous = " ".join(
+                message.get("content", "")
+                for message in history_context
+                if message.get("role") in ("user", "system")
+            )
+            ranked = self.search(f"{question} {previous}")
+
+        if not ranked:
+            return list(self.tables.values())
+
+        selected = [result["table_name"] for result in ranked[:top_k]]
+
+        joins = self.join_candidates(selected)
+        for candidate in joins:
+            if len(selected) >= top_k + settings.SCHEMA_INDEX_MAX_JOIN_TABLES:
+                break
+            if candidate["other_table"] not in selected:
+                selected.append(candidate["other_table"])
+
+        tables = []
+        for table_name in selected:
+            table_joins = [
+                {key: candidate[key] for key in ("column", "other_table", "other_column")}
+                for candidate in joins
+                if candidate["table_name"] == table_name and candidate["other_table"] in selected
+            ]
+            table = dict(self.tables[table_name])
+            if table_joins:
+                table["join_candidates"] = table_joins
+            tables.append(table)
+
+        return tables
+
+
+# Per-process index per user, rebuilt whenever the user's schemas change
+_indexes: Dict[str, SchemaIndex] = {}
+
+
+def build_schema_index(user_id: str, tables: List[Dict[str, Any]]) -> SchemaIndex:
+    index = SchemaIndex(tables)
+    _indexes[str(user_id)] = index
+    return index
+
+
+def get_schema_index(user_id: str, tables: List[Dict[str, Any]]) -> SchemaIndex:
+    index = _indexes.get(str(user_id))
+    if index is None or index.signature != tables_signature(tables):
+        index = build_schema_index(user_id, tables)
+    return index
@@ -0,0 +1,232 @@
+# app/utils/sql_validator.py
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import OptimizeError, SqlglotError
+from sqlglot.optimizer.qualify import qualify
+from sqlglot.schema import MappingSchema
+
+
+class SQLValidationError(ValueError):
+    pass
+
+
+class SchemaLookup:
+    """
+    Case-insensitive lookup of the user's table and column names, built once per
+    set of table versions so every identifier resolves with a dict hit.
+    """
+
+    def __init__(self, tables: List[Dict[str, Any]]):
+        self.tables: Dict[str, str] = {}
+        self.columns: Dict[str, Dict[str, str]] = {}
+
+        for table in tables:
+            table_name = table["table_name"]
+            self.tables[table_name.lower()] = table_name
+            self.columns[table_name] = {
+                col["column_name"].lower(): col["column_name"]
+                for col in table.get("schema") or []
+            }
+
+    def table(self, name: str) -> str | None:
+        return self.tables.get(name.lower())
+
+    def column(self, name: str, table_names: List[str]) -> str | None:
+        lowered = name.lower()
+        for table_name in table_names:
+            column = self.columns.get(table_name, {}).get(lowered)
+            if column:
+                return column
+        return None
+
+    def mapping_schema(self, table_names: List[str]) -> MappingSchema:
+        return MappingSchema(
+            {
+                table_name: {column: "TEXT" for column in self.columns[table_name].values()}
+                for table_name in table_names
+            },
+            dialect="postgres",
+            normalize=False,
+        )
+
+
+# Lookups for recently seen table versions, keyed by the mapping fingerprints
+_lookups: "OrderedDict[tuple, SchemaLookup]" = OrderedDict()
+LOOKUP_CACHE_SIZE = 128
+
+
+def get_schema_lookup(tables: List[Dict[str, Any]]) -> SchemaLookup:
+    """``SchemaLookup`` for ``tables``, reused while none of the tables change."""
+    if not all(table.get("fingerprint") for table in tables):
+        return SchemaLookup(tables)
+
+    key = tuple(sorted(table["fingerprint"] for table in tables))
+    lookup = _lookups.get(key)
+
+    if lookup is None:
+        lookup = SchemaLookup(tables)
+        _lookups[key] = lookup
+        if len(_lookups) > LOOKUP_CACHE_SIZE:
+            _lookups.popitem(last=False)
+    else:
+        _lookups.move_to_end(key)
+
+    return lookup
+
+
+def _is_select_alias(column: exp.Column) -> bool:
+    """
+    Whether ``column`` is a bare ORDER BY / GROUP BY item naming an alias of its
+    own select list, e.g. ``amount`` in ``SUM(amount) AS amount ... ORDER BY amount``.
+    """
+    if column.table:
+        return False
+
+    clause = column.parent
+    if isinstance(clause, exp.Ordered):
+        clause = clause.parent
+    if not isinstance(clause, (exp.Order, exp.Group)):
+        return False
+
+    query = clause.parent
+    if not isinstance(query, exp.Query):
+        return False
+
+    name = column.name.lower()
+    return any(
+        isinstance(select, exp.Alias) and select.alias.lower() == name
+        for select in query.selects
+    )
+
+
+def normalize_identifiers(expression: exp.Expression, lookup: SchemaLookup) -> List[str]:
+    """
+    Rewrite table and column identifiers in ``expression`` to their exact,
+    double-quoted names. Aliases and literals are left alone. Returns the names
+    that were changed.
+    """
+    changed = []
+    cte_names = {cte.alias_or_name.lower() for cte in expression.find_all(exp.CTE)}
+
+    # alias -> real table, so qualified columns resolve against the right table
+    aliases: Dict[str, str] = {}
+    referenced: List[str] = []
+
+    for table in expression.find_all(exp.Table):
+        if not table.name or table.name.lower() in cte_names:
+            continue
+        real_name = lookup.table(table.name)
+        if real_name is None:
+            continue
+
+        if table.name != real_name or not table.this.quoted:
+            changed.append(real_name)
+        table.set("this", exp.to_identifier(real_name, quoted=True))
+
+        referenced.append(real_name)
+        aliases[real_name.lower()] = real_name
+        if table.alias:
+            aliases[table.alias.lower()] = real_name
+
+    for column in expression.find_all(exp.Column):
+        identifier = column.this
+        if not isinstance(identifier, exp.Identifier):
+            continue  # e.g. "*"
+        if _is_select_alias(column):
+            continue
+
+        qualifier = column.table
+        if qualifier:
+            real_table = aliases.get(qualifier.lower())
+            if real_table is None:
+                continue  # subquery or CTE alias
+            if qualifier.lower() == real_table.lower():
+                column.set("table", exp.to_identifier(real_table, quoted=True))
+            candidates = [real_table]
+        else:
+            candidates = referenced
+
+        real_column = lookup.column(identifier.name, candidates)
+        if real_column is None:
+            continue  # select alias, CTE column, ...
+
+        if identifier.name != real_column or not identifier.quoted:
+            changed.append(real_column)
+        column.set("this", exp.to_identifier(real_column, quoted=True))
+
+    return changed
+
+
+def validate_sql(sql: str, tables: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Split ``sql`` into statements, check every referenced table and column against
+    ``tables`` and quote identifiers.
+
+    Returns the same shape as the LLM validator:
+        {"queries": [...], "fixed": bool, "changes_made": "..."}
+
+    Raises SQLValidationError when the SQL cannot be validated locally.
+    """
+    try:
+        statements = [s for s in sqlglot.parse(sql, read="postgres") if s is not None]
+    except SqlglotError as e:
+        raise SQLValidationError(f"Could not parse SQL: {e}") from e
+
+    if not statements:
+        raise SQLValidationError("No SQL statements found")
+
+    lookup = get_schema_lookup(tables)
+    queries = []
+    changes = []
+
+    for statement in statements:
+        if not isinstance(statement, exp.Query):
+            raise SQLValidationError(f"Only SELECT queries are allowed, got {statement.key.upper()}")
+
+        cte_names = {cte.alias_or_name.lower() for cte in statement.find_all(exp.CTE)}
+        unknown = [
+            table.name
+            for table in statement.find_all(exp.Table)
+            if table.name
+            and table.name.lower() not in cte_names
+            and lookup.table(table.name) is None
+        ]
+        if unknown:
+            raise SQLValidationError(f"Unknown table(s): {sorted(set(unknown))}")
+
+        changes.extend(normalize_identifiers(statement, lookup))
+
+        referenced = sorted({
+            lookup.table(table.name)
+            for table in statement.find_all(exp.Table)
+            if table.name and table.name.lower() not in cte_names
+        })
+
+        try:
+            qualify(
+                statement.copy(),
+                schema=lookup.mapping_schema(referenced),
+                dialect="postgres",
+                validate_qualify_columns=True,
+                quote_identifiers=False,
+            )
+        except (OptimizeError, SqlglotError) as e:
+            raise SQLValidationError(str(e)) from e
+
+        queries.append(statement.sql(dialect="postgres"))
+
+    fixed = bool(changes) or len(queries) > 1
+    change_notes = []
+    if changes:
+        change_notes.append(f"Quoted identifiers: {', '.join(sorted(set(changes)))}")
+    if len(queries) > 1:
+        change_notes.append(f"Split into {len(queries)} queries")
+
+    return {
+        "queries": queries,
+        "fixed": fixed,
+        "changes_made": "; ".join(change_notes) or "none",
+    }
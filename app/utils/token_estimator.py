@@ -0,0 +1,43 @@
+# app/utils/token_estimator.py
+from functools import lru_cache
+
+# Conservative ratio for JSON-heavy prompts when no tokenizer is available
+CHARS_PER_TOKEN = 3
+
+
+_fallback_logged = False
+
+
+def _log_fallback(reason: str):
+    global _fallback_logged
+    if not _fallback_logged:
+        _fallback_logged = True
+        print(f"[token_estimator] No tokenizer, estimating tokens from length: {reason}")
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError as e:
+        _log_fallback(str(e))
+        return None
+
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # tiktoken downloads its vocabularies on first use unless
+        # TIKTOKEN_CACHE_DIR is pre-populated (the Docker image does that)
+        _log_fallback(f"{model}: {e}")
+        return None
+
+
+def estimate_tokens(text: str, model: str) -> int:
+    """Token count of ``text`` for ``model``, approximated when no tokenizer is available."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
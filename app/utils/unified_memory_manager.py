@@ -1,8 +1,16 @@
+import asyncio
+
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_community.chat_message_histories import MongoDBChatMessageHistory
 from langchain_openai import ChatOpenAI
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime
 from app.core.config import settings
+from app.models.conversation_summary import ConversationSummary
+
+# Summary refreshes in flight, so they are not garbage collected mid-run
+_background_tasks: set = set()
 
 
 class UnifiedMemoryManager:
@@ -34,43 +42,61 @@ class UnifiedMemoryManager:
     def get_full_history(self):
         return self.chat_history.messages
 
-    async def get_history_context(self, user_query: str):
-        messages = self.chat_history.messages
+    async def load_messages(self):
+        """Stored messages of the thread, read off the event loop."""
+        return await asyncio.to_thread(lambda: self.chat_history.messages)
+
+    @staticmethod
+    def to_context(messages):
+        """Human and AI messages as prompt context entries."""
+        context = []
+        for msg in messages:
+            if msg.type == "human":
+                context.append({"role": "user", "content": msg.content.strip()})
+            elif msg.type == "ai":
+                context.append(
+                    {"role": "assistant", "content": msg.content.strip()}
+                )
+        return context
+
+    def recent_context(self, messages):
+        """The last ``max_messages`` messages as prompt context, without a summary."""
+        return self.to_context(messages[-self.max_messages:])
+
+    async def get_summary(self) -> ConversationSummary | None:
+        return await ConversationSummary.find_one(
+            ConversationSummary.session_id == self.session_id
+        )
 
-        if len(messages) > self.max_messages:
-            to_summarize = messages[:-self.max_messages]
-            recent = messages[-self.max_messages:]
-            summary = await self.summarize_messages(to_summarize)
-            context = []
+    async def summary_context(self, messages):
+        """
+        Recent messages preceded by the stored rolling summary of everything
+        older. Messages evicted from the recent window but not yet folded into
+        the summary are passed through as they are, so no LLM call is needed.
+        """
+        context = []
+        evicted = messages[:-self.max_messages] if len(messages) > self.max_messages else []
 
-            if summary:
+        if evicted:
+            stored = await self.get_summary()
+            summarized_count = stored.summarized_count if stored else 0
+
+            if stored and stored.summary:
                 context.append(
                     {
                         "role": "system",
-                        "content": f"Summary of previous conversation: {summary}",
+                        "content": f"Summary of previous conversation: {stored.summary}",
                     }
                 )
 
-            for msg in recent:
-                if msg.type == "human":
-                    context.append({"role": "user", "content": msg.content.strip()})
-                elif msg.type == "ai":
-                    context.append(
-                        {"role": "assistant", "content": msg.content.strip()}
-                    )
-        else:
-            context = []
-            for msg in messages:
-                if msg.type == "human":
-                    context.append({"role": "user", "content": msg.content.strip()})
-                elif msg.type == "ai":
-                    context.append(
-                        {"role": "assistant", "content": msg.content.strip()}
-                    )
+            context.extend(self.to_context(evicted[summarized_count:]))
 
-        return context
+        return context + self.recent_context(messages)
 
-    async def summarize_messages(self, messages):
+    async def get_history_context(self, user_query: str):
+        return await self.summary_context(await self.load_messages())
+
+    async def summarize_messages(self, messages, previous_summary: str = ""):
         conversation_text = []
 
         for msg in messages:
@@ -80,25 +106,82 @@ class UnifiedMemoryManager:
                 conversation_text.append(AIMessage(content=msg.content.strip()))
 
         if not conversation_text:
-            return ""
-
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    f"Summarize the following conversation in under {self.summary_token_limit} tokens. "
-                    "Focus on key facts, decisions, and context needed for future turns:\n\n{conversation}",
-                )
-            ]
-        )
+            return previous_summary
+
+        if previous_summary:
+            instruction = (
+                f"Here is a summary of a conversation so far:\n\n{{summary}}\n\n"
+                f"Update it with the new messages below, in under {self.summary_token_limit} tokens. "
+                "Keep facts, decisions, and context needed for future turns; drop what the new "
+                "messages make obsolete:\n\n{conversation}"
+            )
+        else:
+            instruction = (
+                f"Summarize the following conversation in under {self.summary_token_limit} tokens. "
+                "Focus on key facts, decisions, and context needed for future turns:\n\n{conversation}"
+            )
+
+        prompt = ChatPromptTemplate.from_messages([("system", instruction)])
 
         chain = prompt | self.llm
         summary_response = await chain.ainvoke(
-            {"conversation": conversation_text}
+            {"conversation": conversation_text, "summary": previous_summary}
         )
 
         return summary_response.content.strip()
 
+    async def refresh_summary(self):
+        """
+        Fold the messages that have left the recent window since the last refresh
+        into the stored summary. Only the new messages are sent to the LLM.
+        """
+        messages = await self.load_messages()
+        evicted = messages[:-self.max_messages] if len(messages) > self.max_messages else []
+
+        stored = await self.get_summary()
+        summarized_count = stored.summarized_count if stored else 0
+        pending = evicted[summarized_count:]
+        if not pending:
+            return
+
+        summary = await self.summarize_messages(
+            pending, stored.summary if stored else ""
+        )
+
+        update = {
+            "summary": summary,
+            "summarized_count": len(evicted),
+            "updated_at": datetime.utcnow(),
+        }
+        collection = ConversationSummary.get_motor_collection()
+
+        try:
+            # Only advance from the state this summary was built on; a concurrent
+            # refresh that got there first wins
+            await collection.update_one(
+                {"session_id": self.session_id, "summarized_count": summarized_count},
+                {"$set": update},
+                upsert=stored is None,
+            )
+        except DuplicateKeyError:
+            pass
+
+    def schedule_summary_refresh(self):
+        async def run():
+            try:
+                await self.refresh_summary()
+            except Exception as e:
+                print(f"[UnifiedMemoryManager] Summary refresh failed for {self.session_id}: {e}")
+
+        task = asyncio.create_task(run())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def remember(self, user_query: str, ai_response: str):
+        """Store the turn, then bring the rolling summary up to date in the background."""
+        await asyncio.to_thread(self.update_memory, user_query, ai_response)
+        self.schedule_summary_refresh()
+
     def update_memory(
         self, user_query: str, ai_response: str, max_ai_chars: int = 2000
     ):
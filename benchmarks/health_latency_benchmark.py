@@ -0,0 +1,90 @@
+# benchmarks/health_latency_benchmark.py
+#
+# Measures "/" health check latency while a large CSV is being ingested, to check
+# that parsing and type inference no longer block the event loop.
+# Needs a running server and a valid access token.
+#
+#   python -m benchmarks.health_latency_benchmark --url http://localhost:8000 --token <jwt>
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+
+def make_csv(target_mb: int) -> str:
+    rng = np.random.default_rng(42)
+    rows_per_chunk = 500_000
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as tmp:
+        header = True
+        while tmp.tell() < target_mb * 1024 * 1024:
+            pd.DataFrame({
+                "Vendor": rng.choice(["Acme", "Globex", "Initech", "Umbrella"], rows_per_chunk),
+                "Monthly_Spend": rng.integers(0, 1_000_000, rows_per_chunk),
+                "Outstanding": np.round(rng.random(rows_per_chunk) * 100_000, 2),
+                "Invoice_Date": pd.Timestamp("2024-01-01")
+                + pd.to_timedelta(rng.integers(0, 365, rows_per_chunk), unit="D"),
+            }).to_csv(tmp, index=False, header=header)
+            header = False
+
+        return tmp.name
+
+
+async def poll_health(client: httpx.AsyncClient, url: str, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(f"{url}/")
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.05)
+    return latencies
+
+
+async def upload(client: httpx.AsyncClient, url: str, token: str, path: str) -> float:
+    started = time.perf_counter()
+    with open(path, "rb") as f:
+        response = await client.post(
+            f"{url}/api/v1/ingest/file",
+            headers={"Authorization": f"Bearer {token}"},
+            files={"input_files": ("benchmark.csv", f, "text/csv")},
+        )
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def main(url: str, token: str, size_mb: int):
+    path = make_csv(size_mb)
+    print(f"Generated {os.path.getsize(path) / 1024 / 1024:.0f} MB CSV")
+
+    try:
+        async with httpx.AsyncClient(timeout=None) as client:
+            stop = asyncio.Event()
+            poller = asyncio.create_task(poll_health(client, url, stop))
+
+            upload_seconds = await upload(client, url, token, path)
+            stop.set()
+            latencies = await poller
+    finally:
+        os.unlink(path)
+
+    latencies.sort()
+    print(f"Upload took {upload_seconds:.1f}s, {len(latencies)} health checks")
+    print(f"p50 {statistics.median(latencies):.1f} ms")
+    print(f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms")
+    print(f"max {latencies[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.url, args.token, args.size_mb))
@@ -0,0 +1,98 @@
+# benchmarks/result_render_benchmark.py
+#
+# Cost of handing a query result to ResponseAgent: the old path (json-safe cell
+# conversion, then json.dumps(rows, indent=2) into the prompt) vs QueryResult
+# (column arrays, token-budgeted render) and the summarizer on top of it.
+#
+#   python -m benchmarks.result_render_benchmark --rows 1000 --columns 20
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app.utils.query_result import QueryResult
+from app.utils.result_summarizer import summarize_result
+from app.utils.token_estimator import estimate_tokens
+
+
+def make_rows(n_rows: int, n_columns: int) -> tuple[list[str], list[tuple]]:
+    columns = []
+    makers = []
+    for c in range(n_columns):
+        kind = c % 4
+        if kind == 0:
+            columns.append(f"amount_{c}")
+            makers.append(lambda r, c=c: Decimal(f"{(r * 37 + c) % 10000}.25"))
+        elif kind == 1:
+            columns.append(f"category_{c}")
+            makers.append(lambda r, c=c: f"category {(r + c) % 12}")
+        elif kind == 2:
+            columns.append(f"day_{c}")
+            makers.append(lambda r: date(2024, 1, 1) + timedelta(days=r % 365))
+        else:
+            columns.append(f"count_{c}")
+            makers.append(lambda r, c=c: (r * c) % 997 if r % 50 else None)
+
+    rows = [tuple(make(r) for make in makers) for r in range(n_rows)]
+    return columns, rows
+
+
+def json_safe(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def old_path(columns, rows) -> str:
+    converted = [[json_safe(value) for value in row] for row in rows]
+    return json.dumps(converted, indent=2)
+
+
+def new_path(columns, rows, max_tokens: int) -> str:
+    return QueryResult.from_rows(columns, rows).render(max_tokens)
+
+
+def measure(label: str, fn, runs: int):
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        text = fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<12} p50 {statistics.median(latencies):8.2f} ms   "
+        f"peak {peak / 1024 / 1024:7.2f} MiB   "
+        f"prompt ~{estimate_tokens(text, 'gpt-4o-mini'):>7,} tokens"
+    )
+
+
+def main(args):
+    columns, rows = make_rows(args.rows, args.columns)
+    print(f"{args.rows} rows x {args.columns} columns")
+
+    measure("json.dumps", lambda: old_path(columns, rows), args.runs)
+    measure("QueryResult", lambda: new_path(columns, rows, args.max_tokens), args.runs)
+    measure(
+        "summarized",
+        lambda: summarize_result(QueryResult.from_rows(columns, rows), args.max_tokens),
+        args.runs,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--max-tokens", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=10)
+    main(parser.parse_args())
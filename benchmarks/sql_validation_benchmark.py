@@ -0,0 +1,91 @@
+# benchmarks/sql_validation_benchmark.py
+#
+# Latency of ExecutorAgent's validation step: the local sqlglot validator vs the
+# LLM validator it replaced. The LLM side needs OPENAI_API_KEY and network access.
+#
+#   python -m benchmarks.sql_validation_benchmark
+#   python -m benchmarks.sql_validation_benchmark --llm --llm-runs 5
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.utils.sql_validator import validate_sql, SQLValidationError
+
+QUERIES = [
+    'SELECT vendor_name, SUM(monthly_spend) AS total FROM tbl_0 GROUP BY 1 ORDER BY total DESC LIMIT 5',
+    "SELECT category, COUNT(*) FROM tbl_0 WHERE category ILIKE '%repairs%' GROUP BY category",
+    'SELECT a.vendor_name, b.amount FROM tbl_0 a JOIN tbl_1 b ON a.vendor_name = b.vendor_name',
+    "SELECT DATE_TRUNC('month', invoice_date) AS m, SUM(amount) FROM tbl_1 GROUP BY m ORDER BY m",
+    'SELECT risk_level, AVG(outstanding) FROM tbl_0 GROUP BY risk_level; SELECT COUNT(*) FROM tbl_1',
+    'WITH t AS (SELECT vendor_name v, amount FROM tbl_1) SELECT v, SUM(amount) s FROM t GROUP BY v ORDER BY s DESC',
+]
+
+
+def make_tables(n_tables: int, n_columns: int) -> list[dict]:
+    base = [
+        "Vendor_Name", "Monthly_Spend", "Outstanding", "Risk_Level",
+        "Category", "Amount", "Invoice_Date",
+    ]
+    return [
+        {
+            "table_name": f"tbl_{t}",
+            "schema": [
+                {"column_name": name, "inferred_type": "string", "description": ""}
+                for name in base + [f"Extra_{c}" for c in range(n_columns - len(base))]
+            ],
+        }
+        for t in range(n_tables)
+    ]
+
+
+def report(label: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{label:<8} p50 {statistics.median(latencies):9.2f} ms   p95 {p95:9.2f} ms   n={len(latencies)}")
+
+
+def bench_local(tables: list[dict], runs: int) -> list[float]:
+    latencies = []
+    for _ in range(runs):
+        for sql in QUERIES:
+            started = time.perf_counter()
+            try:
+                validate_sql(sql, tables)
+            except SQLValidationError as e:
+                print(f"Unexpected fallback for {sql!r}: {e}")
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def bench_llm(tables: list[dict], runs: int) -> list[float]:
+    from app.agents.executor_agent import ExecutorAgent
+
+    agent = ExecutorAgent()
+    latencies = []
+    for _ in range(runs):
+        for sql in QUERIES:
+            started = time.perf_counter()
+            await agent._llm_validate_and_split_queries(sql, "", tables)
+            latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def main(args):
+    tables = make_tables(args.tables, args.columns)
+    print(f"{args.tables} tables x {args.columns} columns, {len(QUERIES)} queries")
+
+    report("local", bench_local(tables, args.runs))
+
+    if args.llm:
+        report("llm", asyncio.run(bench_llm(tables, args.llm_runs)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=3)
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--llm", action="store_true")
+    parser.add_argument("--llm-runs", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+# benchmarks/store_dataframe_benchmark.py
+#
+# Compares the COPY and INSERT load paths of store_dataframe.
+# Needs the Postgres instance configured in .env.
+#
+#   python -m benchmarks.store_dataframe_benchmark
+import asyncio
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+ROW_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        "Vendor": rng.choice(["Acme", "Globex", "Initech", "Umbrella"], rows),
+        "Monthly_Spend": rng.integers(0, 1_000_000, rows),
+        "Outstanding": rng.random(rows) * 100_000,
+        "Active": rng.integers(0, 2, rows).astype(bool),
+        "Invoice_Date": pd.Timestamp("2024-01-01")
+        + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+    })
+
+
+async def _load(rows: int, use_copy: bool) -> float:
+    from app.db.postgres import AsyncSessionLocal, engine
+    from app.db.postgres_utils import store_dataframe
+
+    df = make_frame(rows)
+
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        _, table_name = await store_dataframe(session, df, use_copy=use_copy)
+        elapsed = time.perf_counter() - started
+
+        await session.execute(text(f'DROP TABLE "{table_name}"'))
+        await session.commit()
+
+    await engine.dispose()
+    return elapsed
+
+
+def _run(rows: int, use_copy: bool, queue: multiprocessing.Queue):
+    elapsed = asyncio.run(_load(rows, use_copy))
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put((elapsed, peak_rss_mb))
+
+
+def main():
+    print(f"{'rows':>10} {'mode':>7} {'seconds':>9} {'rows/sec':>12} {'peak RSS MB':>12}")
+
+    for rows in ROW_COUNTS:
+        for use_copy in (True, False):
+            # A fresh process per run so ru_maxrss reflects only this load
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=_run, args=(rows, use_copy, queue))
+            process.start()
+            elapsed, peak_rss_mb = queue.get()
+            process.join()
+
+            mode = "copy" if use_copy else "insert"
+            print(
+                f"{rows:>10} {mode:>7} {elapsed:>9.2f} "
+                f"{rows / elapsed:>12,.0f} {peak_rss_mb:>12,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+
+# Settings() requires these; the tests below never connect to any of them
+for name, value in {
+    "MONGO_URI": "mongodb://localhost:27017",
+    "MONGO_DB_NAME": "insighta_test",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "insighta",
+    "POSTGRES_PASSWORD": "insighta",
+    "POSTGRES_DB": "insighta_test",
+    "POSTGRES_PORT": "5432",
+    "REDIS_HOST": "localhost",
+    "REDIS_PORT": "6379",
+    "REDIS_CHANNEL": "insighta_test",
+    "ADMIN_EMAIL": "admin@example.com",
+    "ADMIN_PWD": "admin",
+    "JWT_SECRET": "test",
+    "JWT_ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_DAYS": "1",
+    "OPENAI_API_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
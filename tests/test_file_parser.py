@@ -0,0 +1,54 @@
+from io import BytesIO
+
+from fastapi import UploadFile
+
+from app.db.postgres_utils import convert_dataframe, datetime_formats_of
+from app.utils.datatype_mapper import infer_columns
+from app.utils.file_parser import iter_csv_chunks
+
+
+def _upload(content: str) -> UploadFile:
+    return UploadFile(file=BytesIO(content.encode()), filename="data.csv")
+
+
+def test_later_chunks_keep_text_values():
+    # Chunk 1 settles both columns as TEXT; chunk 2 alone would look numeric
+    csv = (
+        "code,label,active\n"
+        "A0001,x,true\n"
+        "A0002,y,false\n"
+        "00001,1,true\n"
+        "00002,,false\n"
+    )
+    first, second = iter_csv_chunks(_upload(csv), chunk_size=2)
+
+    columns = infer_columns(first)
+    column_types = {col: info["pg_type"] for col, info in columns.items()}
+    assert column_types == {"code": "TEXT", "label": "TEXT", "active": "BOOLEAN"}
+
+    converted = convert_dataframe(second, column_types)
+    assert converted["code"].tolist() == ["00001", "00002"]
+    assert converted["label"].iloc[0] == "1"
+    assert converted["label"].isna().iloc[1]
+    assert converted["active"].tolist() == [True, False]
+
+
+def test_later_chunks_reuse_the_inferred_datetime_format():
+    # Chunk 1 is unambiguously day-first; chunk 2 alone would read month-first
+    csv = (
+        "day,seen_at\n"
+        "31/01/2024,2024-01-05\n"
+        "15/03/2024,2024-01-06 10:00\n"
+        "01/02/2024,2024-01-07 11:30\n"
+        "03/04/2024,2024-01-08\n"
+    )
+    first, second = iter_csv_chunks(_upload(csv), chunk_size=2)
+
+    columns = infer_columns(first)
+    assert columns["day"]["pg_type"] == "DATE"
+    assert columns["seen_at"]["pg_type"] == "TIMESTAMP"
+
+    column_types = {col: info["pg_type"] for col, info in columns.items()}
+    converted = convert_dataframe(second, column_types, datetime_formats_of(columns))
+    assert converted["day"].dt.strftime("%Y-%m-%d").tolist() == ["2024-02-01", "2024-04-03"]
+    assert converted["seen_at"].notna().all()
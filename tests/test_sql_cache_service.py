@@ -0,0 +1,49 @@
+from app.services.sql_cache_service import (
+    cache_context_key,
+    history_key,
+    is_standalone_question,
+    normalize_question,
+    _similarity,
+)
+
+HISTORY = [
+    {"role": "user", "content": "Total revenue per region"},
+    {"role": "assistant", "content": "North leads with 1.2M."},
+]
+OTHER_HISTORY = [
+    {"role": "user", "content": "How many customers signed up last year?"},
+    {"role": "assistant", "content": "4,210 customers."},
+]
+
+
+def test_normalization_keeps_intent_words():
+    keys = {
+        normalize_question("How many orders per region?"),
+        normalize_question("Show orders by region"),
+        normalize_question("List all orders in each region"),
+    }
+    assert len(keys) == 3
+    assert normalize_question("  How many orders, per region? ") == "how many orders per region"
+
+
+def test_follow_up_question_is_scoped_to_the_conversation():
+    for question in ("and per month?", "only for region X", "What about last year?", "show me those by month"):
+        assert not is_standalone_question(question)
+        assert cache_context_key(question, HISTORY) == history_key(HISTORY)
+        assert cache_context_key(question, HISTORY) != cache_context_key(question, OTHER_HISTORY)
+
+
+def test_standalone_question_is_shared_across_threads():
+    question = "How many orders per region in 2024?"
+    assert is_standalone_question(question)
+    assert cache_context_key(question, HISTORY) == cache_context_key(question, OTHER_HISTORY) == ""
+
+
+def test_similarity_respects_order_and_negation():
+    tokens = normalize_question("orders shipped to germany by month").split()
+    negated = normalize_question("orders not shipped to germany by month").split()
+    reordered = normalize_question("month by germany to shipped orders").split()
+
+    assert _similarity(tokens, tokens) == 1.0
+    assert _similarity(tokens, negated) == 0.0
+    assert _similarity(tokens, reordered) < 0.5
@@ -0,0 +1,34 @@
+from app.utils.sql_validator import validate_sql
+
+TABLES = [
+    {
+        "table_name": "tbl_abc",
+        "schema": [{"column_name": "Region"}, {"column_name": "Amount"}],
+    }
+]
+
+
+def test_select_aliases_are_not_rewritten_to_columns():
+    result = validate_sql(
+        "SELECT region, SUM(amount) AS amount FROM tbl_abc "
+        "GROUP BY region ORDER BY amount DESC",
+        TABLES,
+    )
+
+    assert result["queries"] == [
+        'SELECT "Region", SUM("Amount") AS amount FROM "tbl_abc" '
+        'GROUP BY "Region" ORDER BY amount DESC'
+    ]
+
+
+def test_columns_inside_order_by_expressions_are_still_quoted():
+    result = validate_sql(
+        "SELECT region, SUM(amount) AS total FROM tbl_abc "
+        "GROUP BY region ORDER BY SUM(amount) DESC",
+        TABLES,
+    )
+
+    assert result["queries"] == [
+        'SELECT "Region", SUM("Amount") AS total FROM "tbl_abc" '
+        'GROUP BY "Region" ORDER BY SUM("Amount") DESC'
+    ]